@@ -4,11 +4,16 @@ Configuration management for the Slack Sentiment Analyzer.
 Handles environment variables, validation, and feature flags.
 """
 
-import os
+import json
 import logging
+import os
+import tempfile
+import threading
+from contextvars import ContextVar
 from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
 from typing import Optional, Dict, Any, List
-from dotenv import load_dotenv
 
 
 class ConfigurationError(Exception):
@@ -16,7 +21,58 @@ class ConfigurationError(Exception):
     pass
 
 
-@dataclass
+def _get_int(env: Dict[str, str], name: str, default: int) -> int:
+    """Read an integer setting, falling back to default when unset."""
+    value = env.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ConfigurationError(f"{name} must be an integer, got {value!r}")
+
+
+def _get_bool(env: Dict[str, str], name: str, default: bool) -> bool:
+    """Read a boolean setting ('true' enables), falling back to default when unset."""
+    value = env.get(name)
+    if not value:
+        return default
+    return value.lower() == 'true'
+
+
+# ID of the request being handled, attached to every log record emitted while handling it
+request_id_var: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+
+class _RequestContextFilter(logging.Filter):
+    """Attach the current request ID to each log record."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Copy request_id_var onto the record; never drops records."""
+        record.request_id = request_id_var.get()
+        return True
+
+
+class _JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Serialize the record's level, logger, message, request ID and any traceback."""
+        entry = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id is not None:
+            entry['request_id'] = request_id
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+@dataclass(slots=True)
 class SlackConfig:
     """Slack API configuration."""
     bot_token: str
@@ -24,24 +80,28 @@ class SlackConfig:
     app_token: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GeminiConfig:
     """Gemini AI API configuration."""
     api_key: str
     model_name: str = "gemini-1.5-flash-latest"
     timeout: int = 30
     max_retries: int = 3
+    cache_size: int = 4096
+    concurrency_limit: int = 8
+    batch_window_ms: int = 0
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServerConfig:
     """Flask server configuration."""
     host: str = "0.0.0.0"
     port: int = 3000
     debug: bool = False
+    threads: int = 16
 
 
-@dataclass
+@dataclass(slots=True)
 class DatabaseConfig:
     """Database configuration."""
     url: Optional[str] = None
@@ -49,14 +109,14 @@ class DatabaseConfig:
     max_overflow: int = 20
 
 
-@dataclass
+@dataclass(slots=True)
 class SecurityConfig:
     """Security and encryption configuration."""
     secret_key: str
     encryption_key: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FeatureConfig:
     """Feature flags configuration."""
     enable_japanese_support: bool = True
@@ -72,23 +132,54 @@ class Config:
     def __init__(self):
         """Initialize configuration from environment variables."""
         # Load environment variables
+        from dotenv import load_dotenv
         load_dotenv()
         
-        # Load all configuration sections
-        self.slack = self._load_slack_config()
-        self.gemini = self._load_gemini_config()
-        self.server = self._load_server_config()
-        self.database = self._load_database_config()
-        self.security = self._load_security_config()
-        self.features = self._load_feature_config()
-        
-        # Setup logging
+        # Snapshot the environment once so every loader reads from a plain dict
+        self._env = dict(os.environ)
+    
+    # Configuration sections are built on first access
+    
+    @cached_property
+    def slack(self) -> Optional[SlackConfig]:
+        """Slack configuration, or None in standalone mode."""
+        return self._load_slack_config(self._env)
+    
+    @cached_property
+    def gemini(self) -> GeminiConfig:
+        """Gemini AI configuration."""
+        return self._load_gemini_config(self._env)
+    
+    @cached_property
+    def server(self) -> ServerConfig:
+        """Flask server configuration."""
+        return self._load_server_config(self._env)
+    
+    @cached_property
+    def database(self) -> DatabaseConfig:
+        """Database configuration."""
+        return self._load_database_config(self._env)
+    
+    @cached_property
+    def security(self) -> SecurityConfig:
+        """Security configuration."""
+        return self._load_security_config(self._env)
+    
+    @cached_property
+    def features(self) -> FeatureConfig:
+        """Feature flags configuration."""
+        return self._load_feature_config(self._env)
+    
+    @cached_property
+    def logging_configured(self) -> bool:
+        """Setup logging once, on the first validation or service start."""
         self._setup_logging()
+        return True
     
-    def _load_slack_config(self) -> Optional[SlackConfig]:
+    def _load_slack_config(self, env: Dict[str, str]) -> Optional[SlackConfig]:
         """Load Slack configuration from environment variables."""
-        bot_token = os.getenv('SLACK_BOT_TOKEN')
-        signing_secret = os.getenv('SLACK_SIGNING_SECRET')
+        bot_token = env.get('SLACK_BOT_TOKEN')
+        signing_secret = env.get('SLACK_SIGNING_SECRET')
         
         # For standalone mode, Slack config is optional
         if not bot_token and not signing_secret:
@@ -102,85 +193,156 @@ class Config:
         return SlackConfig(
             bot_token=bot_token,
             signing_secret=signing_secret,
-            app_token=os.getenv('SLACK_APP_TOKEN')
+            app_token=env.get('SLACK_APP_TOKEN')
         )
     
-    def _load_gemini_config(self) -> GeminiConfig:
+    def _load_gemini_config(self, env: Dict[str, str]) -> GeminiConfig:
         """Load Gemini AI configuration from environment variables."""
-        api_key = os.getenv('GEMINI_API_KEY')
+        api_key = env.get('GEMINI_API_KEY')
         if not api_key:
             raise ConfigurationError("GEMINI_API_KEY environment variable is required")
         
         return GeminiConfig(
             api_key=api_key,
-            model_name=os.getenv('GEMINI_MODEL', 'gemini-1.5-flash-latest'),
-            timeout=int(os.getenv('GEMINI_TIMEOUT', '30')),
-            max_retries=int(os.getenv('GEMINI_MAX_RETRIES', '3'))
+            model_name=env.get('GEMINI_MODEL', 'gemini-1.5-flash-latest'),
+            timeout=_get_int(env, 'GEMINI_TIMEOUT', 30),
+            max_retries=_get_int(env, 'GEMINI_MAX_RETRIES', 3),
+            cache_size=_get_int(env, 'GEMINI_CACHE_SIZE', 4096),
+            concurrency_limit=_get_int(env, 'GEMINI_CONCURRENCY_LIMIT', 8),
+            batch_window_ms=_get_int(env, 'GEMINI_BATCH_WINDOW_MS', 0)
         )
     
-    def _load_server_config(self) -> ServerConfig:
+    def _load_server_config(self, env: Dict[str, str]) -> ServerConfig:
         """Load Flask server configuration from environment variables."""
         return ServerConfig(
-            host=os.getenv('HOST', '0.0.0.0'),
-            port=int(os.getenv('PORT', '3000')),
-            debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
+            host=env.get('HOST', '0.0.0.0'),
+            port=_get_int(env, 'PORT', 3000),
+            debug=_get_bool(env, 'FLASK_DEBUG', False),
+            threads=_get_int(env, 'SERVER_THREADS', 16)
         )
     
-    def _load_database_config(self) -> DatabaseConfig:
+    def _load_database_config(self, env: Dict[str, str]) -> DatabaseConfig:
         """Load database configuration from environment variables."""
         return DatabaseConfig(
-            url=os.getenv('DATABASE_URL'),
-            pool_size=int(os.getenv('DB_POOL_SIZE', '10')),
-            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '20'))
+            url=env.get('DATABASE_URL'),
+            pool_size=_get_int(env, 'DB_POOL_SIZE', 10),
+            max_overflow=_get_int(env, 'DB_MAX_OVERFLOW', 20)
         )
     
-    def _load_security_config(self) -> SecurityConfig:
+    def _load_security_config(self, env: Dict[str, str]) -> SecurityConfig:
         """Load security configuration from environment variables."""
-        secret_key = os.getenv('SECRET_KEY')
+        secret_key = env.get('SECRET_KEY')
         if not secret_key:
-            # Generate a default secret key for development
-            import secrets
-            secret_key = secrets.token_hex(32)
+            if env.get('ENVIRONMENT', 'development') == 'production':
+                raise ConfigurationError("SECRET_KEY environment variable is required in production")
+            secret_key = self._load_development_secret_key(env)
         
         return SecurityConfig(
             secret_key=secret_key,
-            encryption_key=os.getenv('ENCRYPTION_KEY')
+            encryption_key=env.get('ENCRYPTION_KEY')
         )
     
-    def _load_feature_config(self) -> FeatureConfig:
+    def _load_development_secret_key(self, env: Dict[str, str]) -> str:
+        """Load the development secret key from the user cache, creating it if needed."""
+        import secrets
+        
+        logger = logging.getLogger(__name__)
+        
+        try:
+            cache_dir = Path(env.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+        except RuntimeError:
+            # No resolvable home directory, so the key cannot outlive this process
+            logger.warning("SECRET_KEY is not set, using a generated development key")
+            return secrets.token_hex(32)
+        key_file = cache_dir / 'slack-sentiment-analyzer' / 'secret_key'
+        
+        existing_key = self._read_secret_key_file(key_file)
+        if existing_key:
+            return existing_key
+        
+        # Generate a default secret key for development and keep it across restarts
+        secret_key = secrets.token_hex(32)
+        try:
+            stored_key = self._store_secret_key_file(key_file, secret_key)
+        except OSError as e:
+            logger.warning("Could not save development secret key to %s: %s", key_file, e)
+            return secret_key
+        
+        if stored_key == secret_key:
+            logger.warning("SECRET_KEY is not set, using a generated development key")
+        return stored_key
+    
+    @staticmethod
+    def _store_secret_key_file(key_file: Path, secret_key: str) -> str:
+        """Store secret_key unless another process got there first, returning the key on disk."""
+        key_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Write to a private temporary file and link it into place, so the key
+        # file never exists without its contents
+        fd, tmp_path = tempfile.mkstemp(dir=key_file.parent, prefix='.secret_key.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(secret_key)
+            
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, key_file)
+                    return secret_key
+                except FileExistsError:
+                    existing_key = Config._read_secret_key_file(key_file)
+                    if existing_key:
+                        return existing_key
+                    # Only an interrupted earlier write leaves an empty key file behind
+                    try:
+                        if key_file.stat().st_size == 0:
+                            key_file.unlink()
+                    except FileNotFoundError:
+                        pass
+            raise FileExistsError(f"{key_file} exists but holds no key")
+        finally:
+            os.unlink(tmp_path)
+    
+    @staticmethod
+    def _read_secret_key_file(key_file: Path) -> Optional[str]:
+        """Return the stored development secret key, or None if it is missing or empty."""
+        try:
+            return key_file.read_text().strip() or None
+        except OSError:
+            return None
+    
+    def _load_feature_config(self, env: Dict[str, str]) -> FeatureConfig:
         """Load feature flags from environment variables."""
         return FeatureConfig(
-            enable_japanese_support=os.getenv('ENABLE_JAPANESE_SUPPORT', 'true').lower() == 'true',
-            enable_data_storage=os.getenv('ENABLE_DATA_STORAGE', 'false').lower() == 'true',
-            enable_async_processing=os.getenv('ENABLE_ASYNC_PROCESSING', 'false').lower() == 'true',
-            default_retention_days=int(os.getenv('DEFAULT_RETENTION_DAYS', '30')),
-            max_retention_days=int(os.getenv('MAX_RETENTION_DAYS', '365'))
+            enable_japanese_support=_get_bool(env, 'ENABLE_JAPANESE_SUPPORT', True),
+            enable_data_storage=_get_bool(env, 'ENABLE_DATA_STORAGE', False),
+            enable_async_processing=_get_bool(env, 'ENABLE_ASYNC_PROCESSING', False),
+            default_retention_days=_get_int(env, 'DEFAULT_RETENTION_DAYS', 30),
+            max_retention_days=_get_int(env, 'MAX_RETENTION_DAYS', 365)
         )
     
     def _setup_logging(self):
         """Setup logging configuration."""
-        log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-        log_format = os.getenv('LOG_FORMAT', 'standard')
+        log_level = self._env.get('LOG_LEVEL', 'INFO').upper()
+        log_format = self._env.get('LOG_FORMAT', 'standard')
         
         if log_format == 'json':
-            formatter = logging.Formatter(
-                '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "message": "%(message)s"}'
-            )
+            formatter = _JsonFormatter()
         else:
             formatter = logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
         
+        # Set up console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        console_handler.addFilter(_RequestContextFilter())
+        
         # Configure root logger
         logging.basicConfig(
             level=getattr(logging, log_level, logging.INFO),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            handlers=[console_handler]
         )
         
-        # Set up console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        
         # Configure specific loggers
         loggers = ['standalone_app', 'gemini_client', 'slack_handler']
         for logger_name in loggers:
@@ -189,9 +351,26 @@ class Config:
     
     def validate(self) -> Dict[str, Any]:
         """Validate the configuration and return validation results."""
+        # Make sure logging is set up before any section is loaded
+        self.logging_configured
+        
         errors = []
         warnings = []
         
+        # Load every section so loader errors are reported rather than raised at first use
+        for section in ('slack', 'gemini', 'server', 'database', 'security', 'features'):
+            try:
+                getattr(self, section)
+            except ConfigurationError as e:
+                errors.append(str(e))
+        
+        if errors:
+            return {
+                'valid': False,
+                'errors': errors,
+                'warnings': warnings
+            }
+        
         # Validate Gemini configuration
         if not self.gemini.api_key:
             errors.append("GEMINI_API_KEY is required")
@@ -202,10 +381,26 @@ class Config:
         if self.gemini.max_retries < 1 or self.gemini.max_retries > 10:
             warnings.append("GEMINI_MAX_RETRIES should be between 1 and 10")
         
+        if self.gemini.cache_size < 0:
+            errors.append("GEMINI_CACHE_SIZE cannot be negative")
+        
+        if self.gemini.concurrency_limit < 1:
+            errors.append("GEMINI_CONCURRENCY_LIMIT must be at least 1")
+        elif self.gemini.concurrency_limit > 64:
+            warnings.append("GEMINI_CONCURRENCY_LIMIT above 64 may trigger API rate limits")
+        
+        if self.gemini.batch_window_ms < 0:
+            errors.append("GEMINI_BATCH_WINDOW_MS cannot be negative")
+        elif self.gemini.batch_window_ms > 1000:
+            warnings.append("GEMINI_BATCH_WINDOW_MS above 1000 adds noticeable latency to every request")
+        
         # Validate server configuration
         if self.server.port < 1 or self.server.port > 65535:
             errors.append("PORT must be between 1 and 65535")
         
+        if self.server.threads < 1:
+            errors.append("SERVER_THREADS must be at least 1")
+        
         # Validate feature configuration
         if self.features.default_retention_days < 1:
             errors.append("DEFAULT_RETENTION_DAYS must be at least 1")
@@ -222,7 +417,7 @@ class Config:
     def config_summary(self) -> Dict[str, Any]:
         """Return a summary of the current configuration."""
         return {
-            'environment': os.getenv('ENVIRONMENT', 'development'),
+            'environment': self._env.get('ENVIRONMENT', 'development'),
             'debug_mode': self.server.debug,
             'slack_enabled': self.slack is not None,
             'japanese_support': self.features.enable_japanese_support,
@@ -234,20 +429,24 @@ class Config:
 
 # Global configuration instance
 _config = None
+_config_lock = threading.Lock()
 
 
 def get_config() -> Config:
     """Get the global configuration instance."""
     global _config
     if _config is None:
-        _config = Config()
+        with _config_lock:
+            if _config is None:
+                _config = Config()
     return _config
 
 
 def reload_config() -> Config:
     """Reload the configuration from environment variables."""
     global _config
-    _config = Config()
+    with _config_lock:
+        _config = Config()
     return _config
 
 
@@ -4,15 +4,154 @@ Google Gemini AI client for sentiment analysis.
 Handles API communication, prompt engineering, and response parsing.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import os
+import queue
 import re
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
-import requests
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Iterator, List, Optional, Union
 
-from config import GeminiConfig
+from config import GeminiConfig, get_config
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
+
+
+def _json_loads(text: str) -> Any:
+    """Decode JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Decoder used to pull a JSON object out of mixed or truncated content
+_JSON_DECODER = json.JSONDecoder()
+
+# A JSON number value running up to the end of the text (i.e. possibly cut short)
+_TRAILING_NUMBER = re.compile(r'[:\[,]\s*-?\d[\d.eE+-]*$')
+
+_SCORE_TO_LABEL = {
+    1: "Very Negative",
+    2: "Negative",
+    3: "Neutral",
+    4: "Positive",
+    5: "Very Positive"
+}
+
+# Fallback keywords mapped to scores, checked in order (first match wins)
+_SENTIMENT_KEYWORDS = {
+    'very positive': 5, 'excellent': 5, 'amazing': 5, 'fantastic': 5,
+    'positive': 4, 'good': 4, 'great': 4, 'happy': 4,
+    'neutral': 3, 'factual': 3, 'informational': 3,
+    'negative': 2, 'bad': 2, 'poor': 2, 'disappointing': 2,
+    'very negative': 1, 'terrible': 1, 'awful': 1, 'hate': 1
+}
+
+# Language-specific cultural context for the sentiment prompt
+_LANGUAGE_INSTRUCTIONS = {
+    'ja': """
+Consider Japanese cultural context:
+- Indirect communication styles (honne vs tatemae)
+- Honorific language and politeness levels
+- Context-dependent meaning
+- Emotional restraint in expression
+    """,
+    'ko': """
+Consider Korean cultural context:
+- Hierarchical communication patterns
+- Honorific language systems
+- Indirect expression of emotions
+    """,
+    'zh': """
+Consider Chinese cultural context:
+- Concept of face (mianzi) in communication
+- Indirect communication styles
+- Contextual meaning interpretation
+    """,
+    'en': """
+Consider English communication patterns:
+- Direct communication style
+- Sarcasm and irony detection
+- Professional vs casual contexts
+    """
+}
+
+_SENTIMENT_SCALE = """Sentiment Scale:
+1 = Very Negative (anger, hostility, severe criticism)
+2 = Negative (disappointment, mild criticism, concern)  
+3 = Neutral (factual, informational, balanced)
+4 = Positive (satisfaction, approval, mild enthusiasm)
+5 = Very Positive (excitement, joy, strong approval, celebration)"""
+
+_PROMPT_HEAD_TEMPLATE = """You are a sentiment analysis expert. Analyze the sentiment of the following text and respond with ONLY a valid JSON object.
+
+Text: "{text}"
+Language: {language}
+Context: {context}
+
+"""
+
+_PROMPT_TAIL_TEMPLATE = """{cultural_context}
+
+""" + _SENTIMENT_SCALE + """
+
+Respond with ONLY this JSON format (no markdown, no explanation outside JSON):
+{{
+    "sentiment_score": [integer 1-5],
+    "sentiment_label": "[Very Negative|Negative|Neutral|Positive|Very Positive]",
+    "confidence": [float 0.0-1.0],
+    "language_detected": "[2-letter language code]",
+    "explanation": "[brief explanation in English]"
+}}"""
+
+# Everything after the per-request fields, rendered once per language
+_PROMPT_TAILS = {
+    lang: _PROMPT_TAIL_TEMPLATE.format(cultural_context=instructions)
+    for lang, instructions in _LANGUAGE_INSTRUCTIONS.items()
+}
+
+_BATCH_PROMPT_TEMPLATE = """You are a sentiment analysis expert. Analyze the sentiment of each of the following {count} texts and respond with ONLY a valid JSON array.
+
+{texts}
+
+Consider the cultural context of each text's language (e.g. indirect communication and politeness levels in Japanese, Korean and Chinese; sarcasm and irony in English).
+
+""" + _SENTIMENT_SCALE + """
+
+Respond with ONLY a JSON array of exactly {count} objects, in the same order as the texts (no markdown, no explanation outside JSON):
+[
+    {{
+        "sentiment_score": [integer 1-5],
+        "sentiment_label": "[Very Negative|Negative|Neutral|Positive|Very Positive]",
+        "confidence": [float 0.0-1.0],
+        "language_detected": "[2-letter language code]",
+        "explanation": "[brief explanation in English]"
+    }}
+]"""
+
+# Generation settings shared by every Gemini request
+_GENERATION_CONFIG = {
+    "temperature": 0.1,  # Low temperature for consistent responses
+    "topP": 0.9,
+    "topK": 20,  # Reduced for more focused responses
+    "maxOutputTokens": 1024,  # Increased to handle thinking tokens
+    "stopSequences": [],  # Don't stop early
+    "candidateCount": 1
+}
+
+_HEADERS = {'Content-Type': 'application/json'}
+
+# Maximum number of texts sent to Gemini in a single batch prompt
+_MAX_BATCH_SIZE = 20
 
 
 class GeminiAPIError(Exception):
@@ -20,7 +159,7 @@ class GeminiAPIError(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class SentimentAnalysisRequest:
     """Request data for sentiment analysis."""
     text: str
@@ -29,7 +168,7 @@ class SentimentAnalysisRequest:
     channel_type: str = 'web'
 
 
-@dataclass
+@dataclass(slots=True)
 class SentimentResponse:
     """Response data from sentiment analysis."""
     sentiment_score: int
@@ -40,19 +179,326 @@ class SentimentResponse:
     processing_time: float
 
 
+class _MicroBatcher:
+    """Collect concurrent single-text analyses and submit them as batch prompts."""
+    
+    def __init__(self, client: "GeminiClient", window: float, max_size: int):
+        """Set up request batching for the given client."""
+        self._client = client
+        self._window = window
+        self._max_size = max_size
+        self._queue: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        
+        # Threads start on first use, so a client created before a pre-forking
+        # server forks gets a live collector and flush pool in each worker
+        self._flush_executor: Optional[ThreadPoolExecutor] = None
+        self._collector_pid = None
+        self._start_lock = threading.Lock()
+    
+    def submit(self, request: SentimentAnalysisRequest) -> Future:
+        """Queue a request, returning a future for its response."""
+        if self._collector_pid != os.getpid():
+            self._start_collector()
+        
+        future: Future = Future()
+        self._queue.put((request, future))
+        return future
+    
+    def _start_collector(self):
+        """Start the collector thread and flush pool for the current process."""
+        with self._start_lock:
+            if self._collector_pid == os.getpid():
+                return
+            
+            # Flushes get their own pool: callers may already be on the client's executor
+            self._flush_executor = ThreadPoolExecutor(
+                max_workers=self._client.config.concurrency_limit,
+                thread_name_prefix='gemini-batch'
+            )
+            threading.Thread(target=self._collect, name='gemini-batcher', daemon=True).start()
+            self._collector_pid = os.getpid()
+    
+    def _collect(self):
+        """Group queued requests that arrive within the window and flush them."""
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            
+            while len(items) < self._max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._flush_executor.submit(self._flush, items)
+    
+    def _flush(self, items: List[tuple]):
+        """Analyze a group with one API call and resolve each caller's future."""
+        if len(items) > 1:
+            try:
+                responses = self._client._request_batch([request for request, _ in items])
+            except BaseException as e:
+                for _, future in items:
+                    future.set_exception(e)
+                return
+            
+            if responses is not None:
+                for (_, future), response in zip(items, responses):
+                    future.set_result(response)
+                return
+        
+        # Analyze the texts separately and concurrently, each resolving its own future
+        for request, future in items[1:]:
+            self._flush_executor.submit(self._resolve, request, future)
+        self._resolve(*items[0])
+    
+    def _resolve(self, request: SentimentAnalysisRequest, future: Future):
+        """Analyze one text with its own API call and resolve its future."""
+        try:
+            future.set_result(self._client._analyze_uncached(request))
+        except BaseException as e:
+            future.set_exception(e)
+
+
 class GeminiClient:
     """Client for Google Gemini AI sentiment analysis."""
     
     def __init__(self, config: GeminiConfig):
         """Initialize the Gemini client."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        
         self.config = config
         self.logger = logging.getLogger('gemini_client.GeminiClient')
+        self._requests = requests
         self.session = requests.Session()
+        
+        # Keep connections to the Gemini endpoint alive across concurrent requests
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self.session.mount('https://', adapter)
+        
         self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{config.model_name}:generateContent?key={config.api_key}"
+        self.stream_url = f"https://generativelanguage.googleapis.com/v1beta/models/{config.model_name}:streamGenerateContent?alt=sse&key={config.api_key}"
+        
+        # Bounded pool for off-thread analyses, sized to respect API rate limits
+        self.executor = ThreadPoolExecutor(
+            max_workers=config.concurrency_limit,
+            thread_name_prefix='gemini'
+        )
+        
+        # LRU cache of results keyed by normalized text digest, language and context
+        self._cache: "OrderedDict[tuple, SentimentResponse]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Pending API calls by cache key, so concurrent identical requests share one call
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Optionally merge concurrent single-text requests into batch prompts
+        self._batcher = None
+        if config.batch_window_ms > 0:
+            self._batcher = _MicroBatcher(self, config.batch_window_ms / 1000, _MAX_BATCH_SIZE)
+    
+    def cache_clear(self):
+        """Remove all cached sentiment results."""
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def _cache_key(self, request: SentimentAnalysisRequest) -> tuple:
+        """Build the cache key for a request from the fields that shape the prompt."""
+        # Collapse whitespace so trivially different copies of a message share an entry
+        normalized_text = ' '.join(request.text.split())
+        digest = hashlib.blake2b(normalized_text.encode('utf-8'), digest_size=16).digest()
+        return (digest, request.language, request.context or None)
+    
+    def _cache_get(self, key: tuple) -> Optional[SentimentResponse]:
+        """Return a copy of the cached result for key, if any."""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            self._cache.move_to_end(key)
+        
+        return replace(cached, processing_time=0.0)
+    
+    def _cache_put(self, key: tuple, response: SentimentResponse):
+        """Store a result in the cache, evicting the least recently used."""
+        if self.config.cache_size <= 0:
+            return
+        
+        with self._cache_lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.config.cache_size:
+                self._cache.popitem(last=False)
     
     def analyze_sentiment(self, request: SentimentAnalysisRequest) -> SentimentResponse:
         """Analyze sentiment of the given text."""
-        start_time = time.time()
+        key = self._cache_key(request)
+        
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.logger.debug("Sentiment analysis served from cache")
+            return cached
+        
+        future, is_owner = self._claim_inflight(key)
+        if not is_owner:
+            return self._wait_inflight(future)
+        
+        try:
+            if self._batcher is not None:
+                sentiment_response = self._batcher.submit(request).result()
+            else:
+                sentiment_response = self._analyze_uncached(request)
+            self._cache_put(key, sentiment_response)
+            future.set_result(sentiment_response)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release_inflight(key)
+        
+        return replace(sentiment_response)
+    
+    def _claim_inflight(self, key: tuple) -> tuple:
+        """Return the pending future for key and whether this caller now owns it."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+    
+    def _wait_inflight(self, future: Future) -> SentimentResponse:
+        """Wait for an identical in-flight analysis, no longer than its owner's retry budget."""
+        self.logger.debug("Waiting on identical in-flight sentiment analysis")
+        try:
+            return replace(future.result(timeout=self.config.timeout * max(self.config.max_retries, 1)))
+        except FutureTimeoutError:
+            raise GeminiAPIError("Timed out waiting for an identical in-flight analysis")
+    
+    def _release_inflight(self, key: tuple):
+        """Forget the pending future for key once its owner has resolved it."""
+        with self._inflight_lock:
+            del self._inflight[key]
+    
+    async def analyze_sentiment_async(self, request: SentimentAnalysisRequest) -> SentimentResponse:
+        """Analyze sentiment on the client's thread pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.analyze_sentiment, request)
+    
+    def analyze_sentiment_stream(self, request: SentimentAnalysisRequest) -> Iterator[Union[str, SentimentResponse]]:
+        """Yield response text chunks as Gemini generates them, then the parsed result."""
+        key = self._cache_key(request)
+        
+        cached = self._cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        # Share identical in-flight analyses, streamed or not, in either direction
+        future, is_owner = self._claim_inflight(key)
+        if not is_owner:
+            yield self._wait_inflight(future)
+            return
+        
+        start_time = time.perf_counter()
+        
+        self.logger.info("Starting streaming sentiment analysis")
+        
+        try:
+            chunks = []
+            for chunk in self._stream_api_request(self._create_sentiment_prompt(request)):
+                chunks.append(chunk)
+                yield chunk
+            
+            sentiment_response = self._parse_api_response(''.join(chunks), request.language)
+            sentiment_response.processing_time = time.perf_counter() - start_time
+            self._cache_put(key, sentiment_response)
+            future.set_result(sentiment_response)
+        except GeneratorExit:
+            # The consumer stopped reading; waiters must not see GeneratorExit
+            future.set_exception(GeminiAPIError("Streaming analysis was abandoned"))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release_inflight(key)
+        
+        self.logger.info("Streaming sentiment analysis completed")
+        yield replace(sentiment_response)
+    
+    def analyze_sentiment_batch(self, analysis_requests: List[SentimentAnalysisRequest]) -> List[Union[SentimentResponse, Exception]]:
+        """Analyze several texts in as few API calls as possible; failed items hold their exception."""
+        results: List[Union[SentimentResponse, Exception, None]] = [None] * len(analysis_requests)
+        pending = []
+        
+        for i, request in enumerate(analysis_requests):
+            cached = self._cache_get(self._cache_key(request))
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+        
+        for offset in range(0, len(pending), _MAX_BATCH_SIZE):
+            chunk = pending[offset:offset + _MAX_BATCH_SIZE]
+            chunk_requests = [analysis_requests[i] for i in chunk]
+            
+            for i, outcome in zip(chunk, self._analyze_batch_uncached(chunk_requests)):
+                if isinstance(outcome, Exception):
+                    results[i] = outcome
+                    continue
+                self._cache_put(self._cache_key(analysis_requests[i]), outcome)
+                results[i] = replace(outcome)
+        
+        return results
+    
+    def _analyze_batch_uncached(self, analysis_requests: List[SentimentAnalysisRequest]) -> List[Union[SentimentResponse, Exception]]:
+        """Analyze a chunk of texts with one API call, falling back to single requests per item."""
+        if len(analysis_requests) > 1:
+            responses = self._request_batch(analysis_requests)
+            if responses is not None:
+                return responses
+        
+        return [self._analyze_or_exception(request) for request in analysis_requests]
+    
+    def _request_batch(self, analysis_requests: List[SentimentAnalysisRequest]) -> Optional[List[SentimentResponse]]:
+        """Analyze texts with one batch prompt, or return None if the reply cannot be matched to them."""
+        start_time = time.perf_counter()
+        
+        self.logger.info("Starting batch sentiment analysis of %d texts", len(analysis_requests))
+        
+        # API failures (already retried) propagate: repeating them per text would only make them worse
+        prompt = self._create_batch_prompt(analysis_requests)
+        response_text = self._make_api_request(prompt, max_output_tokens=1024 + 256 * len(analysis_requests))
+        
+        try:
+            responses = self._parse_batch_response(response_text, len(analysis_requests))
+        except GeminiAPIError as e:
+            self.logger.warning("Batch response unusable, falling back to single requests: %s", e)
+            return None
+        
+        processing_time = time.perf_counter() - start_time
+        for response in responses:
+            response.processing_time = processing_time
+        
+        self.logger.info("Batch sentiment analysis completed")
+        return responses
+    
+    def _analyze_or_exception(self, request: SentimentAnalysisRequest) -> Union[SentimentResponse, Exception]:
+        """Analyze one text, returning the exception instead of raising it."""
+        try:
+            return self._analyze_uncached(request)
+        except Exception as e:
+            return e
+    
+    def _analyze_uncached(self, request: SentimentAnalysisRequest) -> SentimentResponse:
+        """Analyze sentiment by calling the Gemini API."""
+        start_time = time.perf_counter()
         
         self.logger.info("Starting sentiment analysis")
         
@@ -67,119 +513,72 @@ class GeminiClient:
             sentiment_response = self._parse_api_response(response_data, request.language)
             
             # Add processing time
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             sentiment_response.processing_time = processing_time
             
             self.logger.info("Sentiment analysis completed")
             return sentiment_response
             
         except Exception as e:
-            self.logger.error(f"Sentiment analysis failed: {str(e)}")
+            self.logger.error("Sentiment analysis failed: %s", e)
             raise
     
     def _create_sentiment_prompt(self, request: SentimentAnalysisRequest) -> str:
         """Create a culturally-aware prompt for sentiment analysis."""
         
-        # Language-specific cultural context
-        language_instructions = {
-            'ja': """
-Consider Japanese cultural context:
-- Indirect communication styles (honne vs tatemae)
-- Honorific language and politeness levels
-- Context-dependent meaning
-- Emotional restraint in expression
-            """,
-            'ko': """
-Consider Korean cultural context:
-- Hierarchical communication patterns
-- Honorific language systems
-- Indirect expression of emotions
-            """,
-            'zh': """
-Consider Chinese cultural context:
-- Concept of face (mianzi) in communication
-- Indirect communication styles
-- Contextual meaning interpretation
-            """,
-            'en': """
-Consider English communication patterns:
-- Direct communication style
-- Sarcasm and irony detection
-- Professional vs casual contexts
-            """
-        }
-        
         # Determine language for cultural context
         detected_lang = request.language if request.language != 'auto' else 'en'
-        cultural_context = language_instructions.get(detected_lang, language_instructions['en'])
         
-        prompt = f"""You are a sentiment analysis expert. Analyze the sentiment of the following text and respond with ONLY a valid JSON object.
-
-Text: "{request.text}"
-Language: {request.language}
-Context: {request.context or 'General communication'}
-
-{cultural_context}
-
-Sentiment Scale:
-1 = Very Negative (anger, hostility, severe criticism)
-2 = Negative (disappointment, mild criticism, concern)  
-3 = Neutral (factual, informational, balanced)
-4 = Positive (satisfaction, approval, mild enthusiasm)
-5 = Very Positive (excitement, joy, strong approval, celebration)
-
-Respond with ONLY this JSON format (no markdown, no explanation outside JSON):
-{{
-    "sentiment_score": [integer 1-5],
-    "sentiment_label": "[Very Negative|Negative|Neutral|Positive|Very Positive]",
-    "confidence": [float 0.0-1.0],
-    "language_detected": "[2-letter language code]",
-    "explanation": "[brief explanation in English]"
-}}"""
+        return _PROMPT_HEAD_TEMPLATE.format_map({
+            'text': request.text,
+            'language': request.language,
+            'context': request.context or 'General communication'
+        }) + _PROMPT_TAILS.get(detected_lang, _PROMPT_TAILS['en'])
+    
+    def _create_batch_prompt(self, analysis_requests: List[SentimentAnalysisRequest]) -> str:
+        """Create a single prompt covering several texts."""
+        texts = "\n\n".join(
+            f'Text {i}: "{request.text}"\n'
+            f'Language: {request.language}\n'
+            f"Context: {request.context or 'General communication'}"
+            for i, request in enumerate(analysis_requests, 1)
+        )
         
-        return prompt
+        return _BATCH_PROMPT_TEMPLATE.format_map({
+            'count': len(analysis_requests),
+            'texts': texts
+        })
     
-    def _make_api_request(self, prompt: str) -> Dict[str, Any]:
+    def _make_api_request(self, prompt: str, max_output_tokens: int = _GENERATION_CONFIG["maxOutputTokens"]) -> Dict[str, Any]:
         """Make API request to Gemini with retry logic."""
         
+        generation_config = _GENERATION_CONFIG
+        if max_output_tokens != generation_config["maxOutputTokens"]:
+            generation_config = {**generation_config, "maxOutputTokens": max_output_tokens}
+        
         payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": prompt
-                        }
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "temperature": 0.1,  # Low temperature for consistent responses
-                "topP": 0.9,
-                "topK": 20,  # Reduced for more focused responses
-                "maxOutputTokens": 1024,  # Increased to handle thinking tokens
-                "stopSequences": [],  # Don't stop early
-                "candidateCount": 1
-            }
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": generation_config
         }
         
         for attempt in range(self.config.max_retries):
             try:
                 if attempt > 0:
                     delay = min(2 ** attempt, 60)  # Exponential backoff, max 60s
-                    self.logger.info(f"Retrying API request in {delay}s (attempt {attempt + 1})")
+                    self.logger.info("Retrying API request in %ds (attempt %d)", delay, attempt + 1)
                     time.sleep(delay)
                 
                 response = self.session.post(
                     self.api_url,
                     json=payload,
-                    headers={'Content-Type': 'application/json'},
+                    headers=_HEADERS,
                     timeout=self.config.timeout
                 )
                 
                 if response.status_code == 429:  # Rate limit
                     retry_after = int(response.headers.get('Retry-After', '60'))
                     if attempt < self.config.max_retries - 1:
-                        self.logger.warning(f"Rate limited, waiting {retry_after}s")
+                        self.logger.warning("Rate limited, waiting %ds", retry_after)
                         time.sleep(retry_after)
                         continue
                     else:
@@ -191,52 +590,107 @@ Respond with ONLY this JSON format (no markdown, no explanation outside JSON):
                 
                 response_data = response.json()
                 
-                # Debug logging (only if debug level)
-                if self.logger.isEnabledFor(logging.DEBUG):
-                    self.logger.debug(f"Raw API response: {json.dumps(response_data, indent=2)}")
+                # Debug logging (only formatted if debug level is enabled)
+                self.logger.debug("Raw API response: %.1024r", response_data)
                 
                 # Check for valid response structure
-                if 'candidates' not in response_data or not response_data['candidates']:
+                candidates = response_data.get('candidates') or ()
+                if not candidates:
                     raise GeminiAPIError("No candidates in response")
                 
-                candidate = response_data['candidates'][0]
-                
-                if 'content' not in candidate:
-                    raise GeminiAPIError("No content in response candidate")
-                
-                if 'parts' not in candidate['content']:
+                candidate = candidates[0]
+                parts = (candidate.get('content') or {}).get('parts') or ()
+                if not parts:
                     # This happens when MAX_TOKENS is hit during thinking phase
                     if candidate.get('finishReason') == 'MAX_TOKENS':
                         raise GeminiAPIError("Response truncated due to token limit - increase maxOutputTokens")
-                    else:
-                        raise GeminiAPIError("No parts in response content")
-                
-                if not candidate['content']['parts']:
-                    raise GeminiAPIError("Empty parts array in response")
+                    raise GeminiAPIError("No content parts in response candidate")
                 
-                response_text = candidate['content']['parts'][0].get('text', '')
+                response_text = parts[0].get('text') or ''
                 if not response_text:
                     raise GeminiAPIError("Empty response text")
                 
                 # Debug logging for response text
-                if self.logger.isEnabledFor(logging.DEBUG):
-                    self.logger.debug(f"Response text: {response_text[:500]}...")
+                self.logger.debug("Response text: %.500s", response_text)
                 
                 return response_text
                 
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            except (self._requests.exceptions.Timeout, self._requests.exceptions.ConnectionError) as e:
                 if attempt == self.config.max_retries - 1:
                     raise GeminiAPIError(f"API request failed after {self.config.max_retries} attempts: {str(e)}")
-                self.logger.warning(f"API error on attempt {attempt + 1}: {str(e)}")
+                self.logger.warning("API error on attempt %d: %s", attempt + 1, e)
                 continue
             except GeminiAPIError as e:
                 if attempt == self.config.max_retries - 1:
                     raise GeminiAPIError(f"API request failed after {self.config.max_retries} attempts: {str(e)}")
-                self.logger.warning(f"API error on attempt {attempt + 1}: {str(e)}")
+                self.logger.warning("API error on attempt %d: %s", attempt + 1, e)
                 continue
         
         raise GeminiAPIError("Max retries exceeded")
     
+    def _stream_api_request(self, prompt: str) -> Iterator[str]:
+        """Stream response text from Gemini over server-sent events, retrying until output starts."""
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": _GENERATION_CONFIG
+        }
+        
+        delay = 0
+        for attempt in range(self.config.max_retries):
+            is_last_attempt = attempt == self.config.max_retries - 1
+            started = False
+            
+            if delay:
+                self.logger.info("Retrying streaming API request in %ds (attempt %d)", delay, attempt + 1)
+                time.sleep(delay)
+            
+            try:
+                with self.session.post(
+                    self.stream_url,
+                    json=payload,
+                    headers=_HEADERS,
+                    timeout=self.config.timeout,
+                    stream=True
+                ) as response:
+                    # Rate limits and server errors are retried; nothing has been streamed yet
+                    if (response.status_code == 429 or response.status_code >= 500) and not is_last_attempt:
+                        if response.status_code == 429:
+                            delay = int(response.headers.get('Retry-After', '60'))
+                        else:
+                            delay = min(2 ** (attempt + 1), 60)  # Exponential backoff, max 60s
+                        self.logger.warning("Streaming API returned status %d", response.status_code)
+                        continue
+                    
+                    if response.status_code != 200:
+                        raise GeminiAPIError(f"API returned status {response.status_code}: {response.text}")
+                    
+                    # The stream is UTF-8, but without a charset requests would assume ISO-8859-1
+                    response.encoding = 'utf-8'
+                    
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith('data:'):
+                            continue
+                        
+                        candidates = _json_loads(line[5:]).get('candidates') or ()
+                        if not candidates:
+                            continue
+                        
+                        for part in (candidates[0].get('content') or {}).get('parts') or ():
+                            text = part.get('text')
+                            if text:
+                                started = True
+                                yield text
+                    return
+            except (self._requests.exceptions.Timeout, self._requests.exceptions.ConnectionError) as e:
+                if started or is_last_attempt:
+                    raise GeminiAPIError(f"Streaming API request failed: {str(e)}")
+                self.logger.warning("Streaming API error on attempt %d: %s", attempt + 1, e)
+                delay = min(2 ** (attempt + 1), 60)
+            except (self._requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                raise GeminiAPIError(f"Streaming API request failed: {str(e)}")
+        
+        raise GeminiAPIError("Max retries exceeded")
+    
     def _parse_api_response(self, response_text: str, expected_language: str) -> SentimentResponse:
         """Parse and validate the API response."""
         
@@ -245,69 +699,86 @@ Respond with ONLY this JSON format (no markdown, no explanation outside JSON):
         
         # Try to parse as JSON
         try:
-            response_data = json.loads(cleaned_text)
+            response_data = _json_loads(cleaned_text)
             return self._create_sentiment_response(response_data)
         except json.JSONDecodeError as e:
-            self.logger.warning(f"JSON decode error: {e}. Raw text: {cleaned_text[:200]}...")
+            self.logger.warning("JSON decode error: %s. Raw text: %.200s...", e, cleaned_text)
         
-        # Try to extract JSON from mixed content
-        json_match = re.search(r'\{[^{}]*"sentiment_score"[^{}]*\}', cleaned_text, re.DOTALL)
-        if json_match:
-            try:
-                response_data = json.loads(json_match.group())
-                return self._create_sentiment_response(response_data)
-            except json.JSONDecodeError:
-                pass
-        
-        # Try to fix truncated JSON
-        if self._is_truncated_json(cleaned_text):
-            fixed_json = self._fix_truncated_json(cleaned_text)
-            try:
-                response_data = json.loads(fixed_json)
-                return self._create_sentiment_response(response_data)
-            except json.JSONDecodeError:
-                pass
+        # Try to recover the object from mixed or truncated content
+        response_data = self._recover_json_object(cleaned_text)
+        if response_data is not None:
+            return self._create_sentiment_response(response_data)
         
         # Fallback: infer sentiment from text
         return self._infer_sentiment_from_text(cleaned_text, expected_language)
     
+    def _parse_batch_response(self, response_text: str, expected_count: int) -> List[SentimentResponse]:
+        """Parse a JSON array response from a batch prompt."""
+        cleaned_text = self._clean_response_text(response_text)
+        
+        try:
+            response_data = _json_loads(cleaned_text)
+        except json.JSONDecodeError as e:
+            raise GeminiAPIError(f"Invalid JSON in batch response: {str(e)}")
+        
+        if not isinstance(response_data, list) or len(response_data) != expected_count:
+            raise GeminiAPIError(f"Expected a JSON array of {expected_count} results")
+        
+        try:
+            return [self._create_sentiment_response(item) for item in response_data]
+        except (TypeError, ValueError) as e:
+            raise GeminiAPIError(f"Invalid result in batch response: {str(e)}")
+    
     def _clean_response_text(self, text: str) -> str:
         """Clean response text for JSON parsing."""
-        # Remove markdown code blocks
-        text = re.sub(r'```json\s*', '', text)
-        text = re.sub(r'```\s*$', '', text)
-        
-        # Remove extra whitespace
         text = text.strip()
         
+        # Remove markdown code blocks
+        if text.startswith('```json'):
+            text = text[7:].lstrip()
+        if text.endswith('```'):
+            text = text[:-3].rstrip()
+        
         return text
     
-    def _is_truncated_json(self, text: str) -> bool:
-        """Check if JSON appears to be truncated."""
-        text = text.strip()
-        return (
-            text.startswith('{') and 
-            not text.endswith('}') and 
-            '"sentiment_score"' in text
-        )
+    def _recover_json_object(self, text: str) -> Optional[Dict[str, Any]]:
+        """Find a JSON object carrying a sentiment score in text, closing it if it was truncated."""
+        start = text.find('{')
+        while start != -1:
+            data = self._decode_object_at(text, start)
+            if data is not None and 'sentiment_score' in data:
+                return data
+            start = text.find('{', start + 1)
+        
+        return None
     
-    def _fix_truncated_json(self, text: str) -> str:
-        """Attempt to fix truncated JSON."""
-        text = text.strip()
+    def _decode_object_at(self, text: str, start: int) -> Optional[Dict[str, Any]]:
+        """Decode the JSON object starting at start, closing it if it was truncated."""
+        try:
+            data, _ = _JSON_DECODER.raw_decode(text, start)
+            return data if isinstance(data, dict) else None
+        except json.JSONDecodeError as e:
+            # Everything before the error position was valid JSON
+            head = text[start:e.pos].rstrip(', \n\t')
+            
+            # A number cut short can't be trusted, so its member is dropped below
+            number_cut = _TRAILING_NUMBER.search(text, start, e.pos + 1) is not None
         
-        # If it ends with an incomplete value, try to complete it
-        if text.endswith('":'):
-            text += ' 0.95'
-        elif text.endswith(': '):
-            text += '0.95'
-        elif text.endswith(','):
-            text = text[:-1]
+        # Close the object as-is, then retry without the last incomplete member
+        candidates = [] if number_cut else [head + '}']
+        last_comma = head.rfind(',')
+        if last_comma != -1:
+            candidates.append(head[:last_comma] + '}')
         
-        # Ensure it ends with closing brace
-        if not text.endswith('}'):
-            text += '}'
+        for candidate in candidates:
+            try:
+                data = _json_loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                return data
         
-        return text
+        return None
     
     def _create_sentiment_response(self, data: Dict[str, Any]) -> SentimentResponse:
         """Create SentimentResponse from parsed JSON data."""
@@ -321,15 +792,7 @@ Respond with ONLY this JSON format (no markdown, no explanation outside JSON):
             raise GeminiAPIError(f"Invalid sentiment_score: {sentiment_score}")
         
         # Map score to label if not provided
-        score_to_label = {
-            1: "Very Negative",
-            2: "Negative", 
-            3: "Neutral",
-            4: "Positive",
-            5: "Very Positive"
-        }
-        
-        sentiment_label = data.get('sentiment_label', score_to_label[sentiment_score])
+        sentiment_label = data.get('sentiment_label', _SCORE_TO_LABEL[sentiment_score])
         confidence = float(data.get('confidence', 0.95))
         explanation = data.get('explanation', 'Sentiment analysis completed')
         language_detected = data.get('language_detected', 'en')
@@ -349,30 +812,15 @@ Respond with ONLY this JSON format (no markdown, no explanation outside JSON):
         text_lower = text.lower()
         
         # Simple keyword-based inference
-        if any(word in text_lower for word in ['very positive', 'excellent', 'amazing', 'fantastic']):
-            sentiment_score = 5
-        elif any(word in text_lower for word in ['positive', 'good', 'great', 'happy']):
-            sentiment_score = 4
-        elif any(word in text_lower for word in ['neutral', 'factual', 'informational']):
-            sentiment_score = 3
-        elif any(word in text_lower for word in ['negative', 'bad', 'poor', 'disappointing']):
-            sentiment_score = 2
-        elif any(word in text_lower for word in ['very negative', 'terrible', 'awful', 'hate']):
-            sentiment_score = 1
-        else:
-            sentiment_score = 3  # Default to neutral
-        
-        score_to_label = {
-            1: "Very Negative",
-            2: "Negative",
-            3: "Neutral", 
-            4: "Positive",
-            5: "Very Positive"
-        }
+        sentiment_score = 3  # Default to neutral
+        for keyword, score in _SENTIMENT_KEYWORDS.items():
+            if keyword in text_lower:
+                sentiment_score = score
+                break
         
         return SentimentResponse(
             sentiment_score=sentiment_score,
-            sentiment_label=score_to_label[sentiment_score],
+            sentiment_label=_SCORE_TO_LABEL[sentiment_score],
             confidence=0.7,  # Lower confidence for inferred results
             explanation="Sentiment inferred from response text",
             language_detected=expected_language if expected_language != 'auto' else 'en',
@@ -380,6 +828,21 @@ Respond with ONLY this JSON format (no markdown, no explanation outside JSON):
         )
 
 
+# Process-wide client instance
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_client() -> GeminiClient:
+    """Get the process-wide Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeminiClient(get_config().gemini)
+    return _client
+
+
 if __name__ == "__main__":
     # Test the Gemini client
     from config import get_config
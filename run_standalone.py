@@ -7,37 +7,25 @@ Handles environment setup, configuration validation, and service startup.
 import sys
 import os
 import argparse
+import importlib.util
 from pathlib import Path
 
-# Load environment variables first
-from dotenv import load_dotenv
-load_dotenv()
-
-# Import and check configuration
-try:
-    from config import get_config
-    config = get_config()
-    validation = config.validate()
-except Exception as e:
-    print(f"❌ Configuration Error: {e}")
-    sys.exit(1)
-
 
 def check_dependencies():
     """Check if all required dependencies are installed."""
-    required_packages = [
-        'flask',
-        'flask_cors', 
-        'requests',
-        'python-dotenv'
-    ]
+    # Package names mapped to the module each one provides
+    required_packages = {
+        'flask': 'flask',
+        'flask-cors': 'flask_cors',
+        'requests': 'requests',
+        'python-dotenv': 'dotenv'
+    }
     
     missing_packages = []
     
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
+    # Locate modules without importing (and initializing) them
+    for package, module in required_packages.items():
+        if importlib.util.find_spec(module) is None:
             missing_packages.append(package)
     
     if missing_packages:
@@ -71,56 +59,79 @@ def setup_environment():
     return True
 
 
-def print_startup_banner():
+def load_configuration():
+    """Load and validate the configuration, exiting on errors."""
+    try:
+        from config import get_config
+        config = get_config()
+        validation = config.validate()
+    except Exception as e:
+        print(f"❌ Configuration Error: {e}")
+        sys.exit(1)
+    
+    return config, validation
+
+
+def write_lines(lines):
+    """Write a block of lines to stdout with a single write."""
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
+def print_startup_banner(config, validation):
     """Print the startup banner."""
-    print("🎭 Standalone Sentiment Analyzer")
-    print("=" * 40)
-    print("✅ All required dependencies found")
+    lines = [
+        "🎭 Standalone Sentiment Analyzer",
+        "=" * 40,
+        "✅ All required dependencies found"
+    ]
     
     if Path('.env').exists():
-        print("✅ Found existing .env file")
+        lines.append("✅ Found existing .env file")
+    
+    # The summary needs every section, so it is only shown for a valid configuration
+    if not validation['valid']:
+        lines.append("❌ Configuration has errors:")
+        for error in validation['errors']:
+            lines.append(f"  - {error}")
+        write_lines(lines)
+        return False
     
-    print("\n📊 Configuration Status:")
+    lines.append("\n📊 Configuration Status:")
     summary = config.config_summary()
     for key, value in summary.items():
         formatted_key = key.replace('_', ' ').title()
-        print(f"  {formatted_key}: {value}")
+        lines.append(f"  {formatted_key}: {value}")
     
-    if validation['valid']:
-        print("✅ Configuration is valid!")
-    else:
-        print("❌ Configuration has errors:")
-        for error in validation['errors']:
-            print(f"  - {error}")
-        return False
+    lines.append("✅ Configuration is valid!")
     
     if validation['warnings']:
-        print("⚠️  Configuration warnings:")
+        lines.append("⚠️  Configuration warnings:")
         for warning in validation['warnings']:
-            print(f"  - {warning}")
+            lines.append(f"  - {warning}")
     
+    write_lines(lines)
     return True
 
 
-def start_service():
+def start_service(config):
     """Start the Flask service."""
-    print(f"🚀 Starting service on http://{config.server.host}:{config.server.port}")
-    print(f"📍 Web interface: http://{config.server.host}:{config.server.port}")
-    print(f"🔗 API endpoint: http://{config.server.host}:{config.server.port}/api/analyze")
-    print(f"📊 Health check: http://{config.server.host}:{config.server.port}/health")
-    print("✨ Press Ctrl+C to stop the service")
-    print("-" * 40)
+    base_url = f"http://{config.server.host}:{config.server.port}"
+    write_lines([
+        f"🚀 Starting service on {base_url}",
+        f"📍 Web interface: {base_url}",
+        f"🔗 API endpoint: {base_url}/api/analyze",
+        f"📊 Health check: {base_url}/health",
+        "✨ Press Ctrl+C to stop the service",
+        "-" * 40
+    ])
     
     # Import and create the Flask app
-    from standalone_app import create_app
+    from standalone_app import create_app, serve
     app = create_app()
     
     # Start the server
-    app.run(
-        host=config.server.host,
-        port=config.server.port,
-        debug=config.server.debug
-    )
+    serve(app, config)
 
 
 def main():
@@ -139,6 +150,9 @@ def main():
     
     args = parser.parse_args()
     
+    # Load configuration only once the command line has been parsed
+    config, validation = load_configuration()
+    
     try:
         # Check dependencies
         if not check_dependencies():
@@ -149,7 +163,7 @@ def main():
             sys.exit(1)
         
         # Print startup information
-        if not print_startup_banner():
+        if not print_startup_banner(config, validation):
             sys.exit(1)
         
         # If check-only mode, exit here
@@ -158,7 +172,7 @@ def main():
             return
         
         # Start the service
-        start_service()
+        start_service(config)
         
     except KeyboardInterrupt:
         print("\n\n👋 Service stopped by user")
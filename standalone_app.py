@@ -4,59 +4,291 @@ Standalone Flask application for sentiment analysis.
 Provides web interface and REST API without Slack integration.
 """
 
+import gzip
 import json
 import logging
 import time
-from datetime import datetime
-from typing import Dict, Any, List
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 
-from config import get_config
-from gemini_client import GeminiClient, SentimentAnalysisRequest, GeminiAPIError
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to Flask's default encoder
+    orjson = None
+
+try:
+    import waitress
+except ImportError:  # waitress is optional, fall back to Flask's development server
+    waitress = None
+
+from config import Config, get_config, request_id_var
+from gemini_client import SentimentAnalysisRequest, GeminiAPIError, get_gemini_client
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize obj to a JSON string."""
+        return orjson.dumps(obj, default=self.default).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """Deserialize a JSON string or bytes."""
+        return orjson.loads(s)
+
+
+# Longest text accepted for a single analysis
+MAX_TEXT_LENGTH = 10000
+
+# Most texts accepted in one batch request
+MAX_BATCH_SIZE = 50
+
+# Largest request body accepted; bigger ones are refused before being read.
+# Sized for a full batch of maximum-length texts in the worst JSON encoding
+# (12 bytes per character, a \uXXXX surrogate pair), plus 1 MB for ids,
+# languages and contexts
+MAX_CONTENT_LENGTH = MAX_BATCH_SIZE * MAX_TEXT_LENGTH * 12 + 1024 * 1024
+
+# Request defaults, bound once rather than rebuilt per request
+_DEFAULT_LANGUAGE = 'auto'
+_CHANNEL_TYPE = 'web'
+
+# Bound JSON encoder for hand-built bodies (SSE events, error replies)
+if orjson is not None:
+    def _json_dumps(obj: Any) -> str:
+        """Serialize obj to a JSON string with orjson."""
+        return orjson.dumps(obj).decode()
+else:
+    _json_dumps = json.JSONEncoder().encode
+
+# Last formatted timestamp as (epoch second, ISO 8601 string)
+_timestamp_cache = (0, '')
+
+
+def _utc_timestamp() -> str:
+    """Return the current UTC time in ISO 8601, formatted at most once per second."""
+    global _timestamp_cache
+    
+    now = time.time_ns() // 1_000_000_000
+    cached_second, timestamp = _timestamp_cache
+    if now != cached_second:
+        timestamp = datetime.fromtimestamp(now, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        _timestamp_cache = (now, timestamp)
+    
+    return timestamp
+
+
+def _elapsed_ms(start_ns: int) -> float:
+    """Return milliseconds elapsed since a perf_counter_ns() reading, to 0.1 ms."""
+    return round((time.perf_counter_ns() - start_ns) / 1_000_000, 1)
+
+
+@lru_cache(maxsize=None)
+def _error_body(message: str) -> bytes:
+    """Encode a JSON error body once per distinct (fixed) message."""
+    return _json_dumps({'error': message}).encode('utf-8')
+
+
+def _error_response(message: str, status: int) -> Response:
+    """Build a JSON error response from a pre-encoded body."""
+    return Response(_error_body(message), status=status, mimetype='application/json')
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {_json_dumps(data)}\n\n"
+
+
+def _with_request_id(events: Iterator[str], request_id: Optional[str]) -> Iterator[str]:
+    """Re-bind request_id while a streamed body is generated, after its view has returned."""
+    token = request_id_var.set(request_id)
+    try:
+        yield from events
+    finally:
+        request_id_var.reset(token)
+
+
+def _get_json_body() -> Tuple[Any, Optional[str]]:
+    """Parse the current request's JSON body, returning either its data or an error."""
+    data = request.get_json(silent=True)
+    if data is None and request.get_data(cache=True):
+        return None, 'Invalid JSON body'
+    return data, None
+
+
+def _build_analysis_request(data: Dict[str, Any]) -> Tuple[Optional[SentimentAnalysisRequest], Optional[str]]:
+    """Validate the text fields of a request dict, returning either a request or an error."""
+    if 'text' not in data:
+        return None, 'text field is required'
+    
+    text = data['text']
+    
+    if not isinstance(text, str):
+        return None, 'text must be a string'
+    
+    text = text.strip()
+    if not text:
+        return None, 'text cannot be empty'
+    
+    if len(text) > MAX_TEXT_LENGTH:
+        return None, 'text cannot exceed 10,000 characters'
+    
+    language = data.get('language', _DEFAULT_LANGUAGE)
+    if not isinstance(language, str):
+        return None, 'language must be a string'
+    
+    context = data.get('context')
+    if context is not None and not isinstance(context, str):
+        return None, 'context must be a string'
+    
+    analysis_request = SentimentAnalysisRequest(
+        text=text,
+        language=language,
+        context=context,
+        channel_type=_CHANNEL_TYPE
+    )
+    return analysis_request, None
+
+
+def _prepare_analysis_request(data: Any) -> Tuple[Optional[SentimentAnalysisRequest], Optional[str]]:
+    """Validate a single-text request body, returning either a request or an error."""
+    if not data:
+        return None, 'Request body is required'
+    
+    if not isinstance(data, dict):
+        return None, 'Request body must be a JSON object'
+    
+    return _build_analysis_request(data)
+
+
+def _prepare_batch_item(index: int, text_item: Any) -> Tuple[str, Optional[SentimentAnalysisRequest], Optional[str]]:
+    """Validate one batch item, returning its id and either a request or an error."""
+    if isinstance(text_item, str):
+        text_data = {'text': text_item}
+    elif isinstance(text_item, dict):
+        text_data = text_item
+    else:
+        return str(index), None, 'Invalid text item format'
+    
+    item_id = text_data.get('id', str(index))
+    analysis_request, error = _build_analysis_request(text_data)
+    return item_id, analysis_request, error
+
+
+def serve(app: Flask, config: Config) -> None:
+    """Serve the app with waitress when available, else Flask's development server."""
+    if waitress is not None and not config.server.debug:
+        waitress.serve(
+            app,
+            host=config.server.host,
+            port=config.server.port,
+            threads=config.server.threads
+        )
+        return
+    
+    app.run(
+        host=config.server.host,
+        port=config.server.port,
+        debug=config.server.debug,
+        threaded=True  # Requests wait on Gemini I/O concurrently, one thread each
+    )
 
 
 def create_app() -> Flask:
     """Create and configure the Flask application."""
     app = Flask(__name__)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     # Load configuration
     config = get_config()
+    config.logging_configured  # Setup logging on service start
     
     # Configure Flask
     app.config['SECRET_KEY'] = config.security.secret_key
     app.config['DEBUG'] = config.server.debug
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
     
     # Enable CORS for API endpoints
     CORS(app, resources={
         r"/api/*": {
             "origins": "*",
             "methods": ["GET", "POST", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "X-Request-ID"]
         }
     })
     
     # Initialize Gemini client
-    gemini_client = GeminiClient(config.gemini)
+    gemini_client = get_gemini_client()
     
     # Setup logging
     logger = logging.getLogger('standalone_app')
     
+    @app.before_request
+    def bind_request_id():
+        """Bind the caller's X-Request-ID (or a new one) to this request's log records."""
+        request_id = request.headers.get('X-Request-ID', '')[:128] or uuid.uuid4().hex
+        g.request_id_token = request_id_var.set(request_id)
+    
+    @app.after_request
+    def add_request_id(response):
+        """Echo the request ID so callers can correlate responses with log lines."""
+        request_id = request_id_var.get()
+        if request_id is not None:
+            response.headers['X-Request-ID'] = request_id
+        return response
+    
+    @app.teardown_request
+    def unbind_request_id(error):
+        """Clear the request ID once the request, including any stream, is finished."""
+        token = g.pop('request_id_token', None)
+        if token is not None:
+            request_id_var.reset(token)
+    
+    # Load the static web interface once, along with a gzip-compressed copy
+    with app.open_resource('static/index.html') as f:
+        index_html = f.read()
+    index_html_gzip = gzip.compress(index_html, compresslevel=9)
+    
     @app.route('/')
     def index():
         """Serve the web interface."""
-        return render_template_string(WEB_INTERFACE_TEMPLATE)
+        if request.accept_encodings['gzip'] > 0:
+            response = Response(index_html_gzip, mimetype='text/html')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(index_html, mimetype='text/html')
+        
+        response.vary.add('Accept-Encoding')
+        return response
+    
+    # The configuration is fixed for the app's lifetime, so summarize it once;
+    # the encoded health body is then reused until its timestamp changes
+    config_summary = config.config_summary()
+    health_body = ('', b'')
     
     @app.route('/health')
     def health():
         """Health check endpoint."""
-        return jsonify({
-            'status': 'healthy',
-            'timestamp': datetime.utcnow().isoformat(),
-            'version': '1.0.0',
-            'config': config.config_summary()
-        })
+        nonlocal health_body
+        
+        timestamp = _utc_timestamp()
+        if health_body[0] != timestamp:
+            health_body = (timestamp, _json_dumps({
+                'status': 'healthy',
+                'timestamp': timestamp,
+                'version': '1.0.0',
+                'config': config_summary
+            }).encode('utf-8'))
+        
+        return Response(health_body[1], mimetype='application/json')
     
     @app.route('/api/analyze', methods=['POST'])
     def analyze_sentiment():
@@ -66,35 +298,19 @@ def create_app() -> Flask:
         try:
             # Validate request
             if not request.is_json:
-                return jsonify({'error': 'Content-Type must be application/json'}), 400
+                return _error_response('Content-Type must be application/json', 400)
             
-            data = request.get_json()
-            if not data:
-                return jsonify({'error': 'Request body is required'}), 400
+            data, error = _get_json_body()
+            if error:
+                return _error_response(error, 400)
             
-            # Validate required fields
-            if 'text' not in data:
-                return jsonify({'error': 'text field is required'}), 400
-            
-            text = data['text'].strip()
-            if not text:
-                return jsonify({'error': 'text cannot be empty'}), 400
-            
-            if len(text) > 10000:
-                return jsonify({'error': 'text cannot exceed 10,000 characters'}), 400
-            
-            # Create analysis request
-            analysis_request = SentimentAnalysisRequest(
-                text=text,
-                language=data.get('language', 'auto'),
-                context=data.get('context'),
-                channel_type='web'
-            )
+            analysis_request, error = _prepare_analysis_request(data)
+            if error:
+                return _error_response(error, 400)
             
             # Perform analysis
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             response = gemini_client.analyze_sentiment(analysis_request)
-            processing_time_ms = (time.time() - start_time) * 1000
             
             # Format response
             result = {
@@ -103,27 +319,87 @@ def create_app() -> Flask:
                 'confidence': response.confidence,
                 'explanation': response.explanation,
                 'language_detected': response.language_detected,
-                'processing_time_ms': round(processing_time_ms, 1),
-                'timestamp': datetime.utcnow().isoformat()
+                'processing_time_ms': _elapsed_ms(start_ns),
+                'timestamp': _utc_timestamp()
             }
             
             logger.info("Sentiment analysis completed")
             return jsonify(result)
             
+        except RequestEntityTooLarge:
+            raise  # Answered by the 413 handler
+            
         except GeminiAPIError as e:
-            logger.error(f"Sentiment analysis failed: {str(e)}")
+            logger.error("Sentiment analysis failed: %s", e)
             return jsonify({
                 'error': 'Sentiment analysis failed',
                 'details': str(e)
             }), 500
             
         except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
+            logger.exception("Unexpected error: %s", e)
             return jsonify({
                 'error': 'Internal server error',
                 'details': str(e)
             }), 500
     
+    @app.route('/api/analyze/stream', methods=['POST'])
+    def analyze_sentiment_stream():
+        """Analyze sentiment of a single message, streaming progress as server-sent events."""
+        logger.info("Processing streaming sentiment analysis request")
+        
+        if not request.is_json:
+            return _error_response('Content-Type must be application/json', 400)
+        
+        data, error = _get_json_body()
+        if error:
+            return _error_response(error, 400)
+        
+        analysis_request, error = _prepare_analysis_request(data)
+        if error:
+            return _error_response(error, 400)
+        
+        def generate():
+            start_ns = time.perf_counter_ns()
+            
+            try:
+                for item in gemini_client.analyze_sentiment_stream(analysis_request):
+                    if isinstance(item, str):
+                        yield _sse_event('chunk', {'text': item})
+                        continue
+                    
+                    yield _sse_event('result', {
+                        'sentiment_score': item.sentiment_score,
+                        'sentiment_label': item.sentiment_label,
+                        'confidence': item.confidence,
+                        'explanation': item.explanation,
+                        'language_detected': item.language_detected,
+                        'processing_time_ms': _elapsed_ms(start_ns),
+                        'timestamp': _utc_timestamp()
+                    })
+                
+                logger.info("Streaming sentiment analysis completed")
+                
+            except GeminiAPIError as e:
+                logger.error("Streaming sentiment analysis failed: %s", e)
+                yield _sse_event('error', {
+                    'error': 'Sentiment analysis failed',
+                    'details': str(e)
+                })
+                
+            except Exception as e:
+                logger.exception("Unexpected error: %s", e)
+                yield _sse_event('error', {
+                    'error': 'Internal server error',
+                    'details': str(e)
+                })
+        
+        events = _with_request_id(generate(), request_id_var.get())
+        response = Response(stream_with_context(events), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
     @app.route('/api/batch', methods=['POST'])
     def batch_analyze():
         """Analyze sentiment of multiple messages."""
@@ -132,87 +408,54 @@ def create_app() -> Flask:
         try:
             # Validate request
             if not request.is_json:
-                return jsonify({'error': 'Content-Type must be application/json'}), 400
+                return _error_response('Content-Type must be application/json', 400)
+            
+            data, error = _get_json_body()
+            if error:
+                return _error_response(error, 400)
             
-            data = request.get_json()
             if not data:
-                return jsonify({'error': 'Request body is required'}), 400
+                return _error_response('Request body is required', 400)
+            
+            if not isinstance(data, dict):
+                return _error_response('Request body must be a JSON object', 400)
             
             # Validate required fields
             if 'texts' not in data:
-                return jsonify({'error': 'texts field is required'}), 400
+                return _error_response('texts field is required', 400)
             
             texts = data['texts']
             if not isinstance(texts, list):
-                return jsonify({'error': 'texts must be an array'}), 400
+                return _error_response('texts must be an array', 400)
             
             if len(texts) == 0:
-                return jsonify({'error': 'texts array cannot be empty'}), 400
+                return _error_response('texts array cannot be empty', 400)
             
-            if len(texts) > 50:
-                return jsonify({'error': 'Cannot process more than 50 texts at once'}), 400
+            if len(texts) > MAX_BATCH_SIZE:
+                return _error_response('Cannot process more than 50 texts at once', 400)
             
-            # Process each text
-            results = []
-            successful = 0
-            failed = 0
+            # Validate and dispatch in one pass, keeping results in request order;
+            # valid items start on the client's bounded pool while later ones are checked
+            results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+            futures = []
             
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             
             for i, text_item in enumerate(texts):
+                item_id, analysis_request, error = _prepare_batch_item(i, text_item)
+                if error:
+                    results[i] = {'id': item_id, 'error': error}
+                else:
+                    future = gemini_client.executor.submit(gemini_client.analyze_sentiment, analysis_request)
+                    futures.append((i, item_id, future))
+            
+            for i, item_id, future in futures:
                 try:
-                    # Validate text item
-                    if isinstance(text_item, str):
-                        text_data = {'text': text_item, 'id': str(i)}
-                    elif isinstance(text_item, dict):
-                        text_data = text_item
-                    else:
-                        results.append({
-                            'id': str(i),
-                            'error': 'Invalid text item format'
-                        })
-                        failed += 1
-                        continue
-                    
-                    if 'text' not in text_data:
-                        results.append({
-                            'id': text_data.get('id', str(i)),
-                            'error': 'text field is required'
-                        })
-                        failed += 1
-                        continue
-                    
-                    text = text_data['text'].strip()
-                    if not text:
-                        results.append({
-                            'id': text_data.get('id', str(i)),
-                            'error': 'text cannot be empty'
-                        })
-                        failed += 1
-                        continue
-                    
-                    if len(text) > 10000:
-                        results.append({
-                            'id': text_data.get('id', str(i)),
-                            'error': 'text cannot exceed 10,000 characters'
-                        })
-                        failed += 1
-                        continue
-                    
-                    # Create analysis request
-                    analysis_request = SentimentAnalysisRequest(
-                        text=text,
-                        language=text_data.get('language', 'auto'),
-                        context=text_data.get('context'),
-                        channel_type='web'
-                    )
-                    
-                    # Perform analysis
-                    response = gemini_client.analyze_sentiment(analysis_request)
+                    response = future.result()
                     
                     # Format response
-                    result = {
-                        'id': text_data.get('id', str(i)),
+                    results[i] = {
+                        'id': item_id,
                         'sentiment_score': response.sentiment_score,
                         'sentiment_label': response.sentiment_label,
                         'confidence': response.confidence,
@@ -221,24 +464,20 @@ def create_app() -> Flask:
                         'processing_time_ms': round(response.processing_time * 1000, 1)
                     }
                     
-                    results.append(result)
-                    successful += 1
-                    
                 except GeminiAPIError as e:
-                    results.append({
-                        'id': text_data.get('id', str(i)),
+                    results[i] = {
+                        'id': item_id,
                         'error': f'Analysis failed: {str(e)}'
-                    })
-                    failed += 1
+                    }
                     
                 except Exception as e:
-                    results.append({
-                        'id': text_data.get('id', str(i)),
+                    results[i] = {
+                        'id': item_id,
                         'error': f'Unexpected error: {str(e)}'
-                    })
-                    failed += 1
+                    }
             
-            total_time_ms = (time.time() - start_time) * 1000
+            failed = sum(1 for result in results if 'error' in result)
+            successful = len(results) - failed
             
             # Format batch response
             batch_result = {
@@ -247,16 +486,19 @@ def create_app() -> Flask:
                     'total': len(texts),
                     'successful': successful,
                     'failed': failed,
-                    'total_processing_time_ms': round(total_time_ms, 1)
+                    'total_processing_time_ms': _elapsed_ms(start_ns)
                 },
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': _utc_timestamp()
             }
             
-            logger.info(f"Batch analysis completed: {successful} successful, {failed} failed")
+            logger.info("Batch analysis completed: %d successful, %d failed", successful, failed)
             return jsonify(batch_result)
             
+        except RequestEntityTooLarge:
+            raise  # Answered by the 413 handler
+            
         except Exception as e:
-            logger.error(f"Batch analysis failed: {str(e)}")
+            logger.exception("Batch analysis failed: %s", e)
             return jsonify({
                 'error': 'Batch analysis failed',
                 'details': str(e)
@@ -265,377 +507,26 @@ def create_app() -> Flask:
     @app.errorhandler(404)
     def not_found(error):
         """Handle 404 errors."""
-        return jsonify({'error': 'Endpoint not found'}), 404
+        return _error_response('Endpoint not found', 404)
     
     @app.errorhandler(405)
     def method_not_allowed(error):
         """Handle 405 errors."""
-        return jsonify({'error': 'Method not allowed'}), 405
+        return _error_response('Method not allowed', 405)
+    
+    @app.errorhandler(413)
+    def request_too_large(error):
+        """Handle 413 errors."""
+        return _error_response('Request body too large', 413)
     
     @app.errorhandler(500)
     def internal_error(error):
         """Handle 500 errors."""
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response('Internal server error', 500)
     
     return app
 
 
-# Web interface template
-WEB_INTERFACE_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sentiment Analyzer</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        
-        .header {
-            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }
-        
-        .header h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            font-weight: 300;
-        }
-        
-        .header p {
-            opacity: 0.9;
-            font-size: 1.1em;
-        }
-        
-        .content {
-            padding: 40px;
-        }
-        
-        .form-group {
-            margin-bottom: 25px;
-        }
-        
-        label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: #333;
-        }
-        
-        textarea, select, input {
-            width: 100%;
-            padding: 15px;
-            border: 2px solid #e1e5e9;
-            border-radius: 10px;
-            font-size: 16px;
-            transition: border-color 0.3s ease;
-        }
-        
-        textarea:focus, select:focus, input:focus {
-            outline: none;
-            border-color: #4facfe;
-        }
-        
-        textarea {
-            min-height: 120px;
-            resize: vertical;
-        }
-        
-        .form-row {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 20px;
-        }
-        
-        .btn {
-            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-            color: white;
-            border: none;
-            padding: 15px 30px;
-            border-radius: 10px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: transform 0.2s ease;
-            width: 100%;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-        }
-        
-        .btn:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none;
-        }
-        
-        .result {
-            margin-top: 30px;
-            padding: 25px;
-            border-radius: 15px;
-            display: none;
-        }
-        
-        .result.success {
-            background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
-            border-left: 5px solid #00d4aa;
-        }
-        
-        .result.error {
-            background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%);
-            border-left: 5px solid #ff6b6b;
-        }
-        
-        .sentiment-score {
-            font-size: 3em;
-            font-weight: bold;
-            text-align: center;
-            margin: 20px 0;
-        }
-        
-        .sentiment-label {
-            font-size: 1.5em;
-            text-align: center;
-            margin-bottom: 20px;
-            font-weight: 600;
-        }
-        
-        .details {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-top: 20px;
-        }
-        
-        .detail-item {
-            background: rgba(255,255,255,0.7);
-            padding: 15px;
-            border-radius: 10px;
-        }
-        
-        .detail-label {
-            font-weight: 600;
-            color: #666;
-            font-size: 0.9em;
-            margin-bottom: 5px;
-        }
-        
-        .detail-value {
-            font-size: 1.1em;
-            color: #333;
-        }
-        
-        .explanation {
-            background: rgba(255,255,255,0.7);
-            padding: 20px;
-            border-radius: 10px;
-            margin-top: 20px;
-        }
-        
-        .loading {
-            text-align: center;
-            padding: 20px;
-        }
-        
-        .spinner {
-            border: 3px solid #f3f3f3;
-            border-top: 3px solid #4facfe;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 15px;
-        }
-        
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
-        .score-1 { color: #ff4757; }
-        .score-2 { color: #ff6348; }
-        .score-3 { color: #ffa502; }
-        .score-4 { color: #2ed573; }
-        .score-5 { color: #1dd1a1; }
-        
-        @media (max-width: 600px) {
-            .form-row {
-                grid-template-columns: 1fr;
-            }
-            
-            .details {
-                grid-template-columns: 1fr;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🎭 Sentiment Analyzer</h1>
-            <p>Analyze the emotional tone of any text with AI-powered precision</p>
-        </div>
-        
-        <div class="content">
-            <form id="sentimentForm">
-                <div class="form-group">
-                    <label for="text">Text to Analyze</label>
-                    <textarea 
-                        id="text" 
-                        name="text" 
-                        placeholder="Enter the text you want to analyze for sentiment..."
-                        required
-                    ></textarea>
-                </div>
-                
-                <div class="form-row">
-                    <div class="form-group">
-                        <label for="language">Language</label>
-                        <select id="language" name="language">
-                            <option value="auto">Auto-detect</option>
-                            <option value="en">English</option>
-                            <option value="ja">Japanese</option>
-                            <option value="es">Spanish</option>
-                            <option value="fr">French</option>
-                            <option value="de">German</option>
-                            <option value="zh">Chinese</option>
-                            <option value="ko">Korean</option>
-                        </select>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="context">Context (Optional)</label>
-                        <input 
-                            type="text" 
-                            id="context" 
-                            name="context" 
-                            placeholder="e.g., customer feedback, social media"
-                        />
-                    </div>
-                </div>
-                
-                <button type="submit" class="btn" id="analyzeBtn">
-                    Analyze Sentiment
-                </button>
-            </form>
-            
-            <div id="loading" class="loading" style="display: none;">
-                <div class="spinner"></div>
-                <p>Analyzing sentiment...</p>
-            </div>
-            
-            <div id="result" class="result"></div>
-        </div>
-    </div>
-
-    <script>
-        document.getElementById('sentimentForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const formData = new FormData(e.target);
-            const data = {
-                text: formData.get('text'),
-                language: formData.get('language'),
-                context: formData.get('context') || undefined
-            };
-            
-            // Show loading
-            document.getElementById('loading').style.display = 'block';
-            document.getElementById('result').style.display = 'none';
-            document.getElementById('analyzeBtn').disabled = true;
-            
-            try {
-                const response = await fetch('/api/analyze', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(data)
-                });
-                
-                const result = await response.json();
-                
-                if (response.ok) {
-                    showResult(result);
-                } else {
-                    showError(result.error || 'Analysis failed');
-                }
-            } catch (error) {
-                showError('Network error: ' + error.message);
-            } finally {
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('analyzeBtn').disabled = false;
-            }
-        });
-        
-        function showResult(result) {
-            const resultDiv = document.getElementById('result');
-            resultDiv.className = 'result success';
-            resultDiv.innerHTML = `
-                <div class="sentiment-score score-${result.sentiment_score}">${result.sentiment_score}/5</div>
-                <div class="sentiment-label">${result.sentiment_label}</div>
-                
-                <div class="details">
-                    <div class="detail-item">
-                        <div class="detail-label">Confidence</div>
-                        <div class="detail-value">${Math.round(result.confidence * 100)}%</div>
-                    </div>
-                    <div class="detail-item">
-                        <div class="detail-label">Language</div>
-                        <div class="detail-value">${result.language_detected.toUpperCase()}</div>
-                    </div>
-                    <div class="detail-item">
-                        <div class="detail-label">Processing Time</div>
-                        <div class="detail-value">${result.processing_time_ms}ms</div>
-                    </div>
-                </div>
-                
-                <div class="explanation">
-                    <div class="detail-label">Analysis Explanation</div>
-                    <div class="detail-value">${result.explanation}</div>
-                </div>
-            `;
-            resultDiv.style.display = 'block';
-        }
-        
-        function showError(error) {
-            const resultDiv = document.getElementById('result');
-            resultDiv.className = 'result error';
-            resultDiv.innerHTML = `
-                <h3>❌ Analysis Failed</h3>
-                <p>${error}</p>
-            `;
-            resultDiv.style.display = 'block';
-        }
-    </script>
-</body>
-</html>
-"""
-
-
 if __name__ == '__main__':
     app = create_app()
     config = get_config()
@@ -647,8 +538,4 @@ if __name__ == '__main__':
     print(f"📊 Health check: http://{config.server.host}:{config.server.port}/health")
     print("✨ Press Ctrl+C to stop the service")
     
-    app.run(
-        host=config.server.host,
-        port=config.server.port,
-        debug=config.server.debug
-    )
\ No newline at end of file
+    serve(app, config)
\ No newline at end of file
@@ -7,6 +7,65 @@ import requests
 import json
 import os
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
+
+# Your original model
+MODEL_NAME = "gemini-2.5-flash-preview-05-20"
+API_URL_TEMPLATE = f"https://generativelanguage.googleapis.com/v1beta/models/{MODEL_NAME}:generateContent?key={{api_key}}"
+
+PAYLOAD = {
+    "contents": [
+        {
+            "parts": [
+                {
+                    "text": """
+                    Analyze the sentiment of this message: "Great work team! This project is fantastic!"
+                    
+                    Respond in JSON format:
+                    {
+                        "sentiment_score": [1-5 integer where 5 is very positive],
+                        "sentiment_label": "[Very Negative|Negative|Neutral|Positive|Very Positive]",
+                        "confidence": [0.0-1.0 float],
+                        "language_detected": "en",
+                        "explanation": "brief explanation"
+                    }
+                    """
+                }
+            ]
+        }
+    ],
+    "generationConfig": {
+        "temperature": 0.1,
+        "topP": 0.8,
+        "topK": 40,
+        "maxOutputTokens": 1024
+    }
+}
+
+# Encoded once; every check sends the same request body
+PAYLOAD_BYTES = json.dumps(PAYLOAD).encode('utf-8')
+HEADERS = {'Content-Type': 'application/json'}
+
+# Shared session so repeated checks reuse the connection to the Gemini API,
+# retrying briefly on rate limits and transient server errors
+session = requests.Session()
+session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'POST'}),
+        raise_on_status=False
+    )
+))
 
 def test_original_model():
     """Test your original model specification."""
@@ -20,52 +79,21 @@ def test_original_model():
         print("***REMOVED_GEMINI_KEY***your_actual_api_key_here")
         return False
     
-    # Your original model
-    model_name = "gemini-2.5-flash-preview-05-20"
-    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}"
-    
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": """
-                        Analyze the sentiment of this message: "Great work team! This project is fantastic!"
-                        
-                        Respond in JSON format:
-                        {
-                            "sentiment_score": [1-5 integer where 5 is very positive],
-                            "sentiment_label": "[Very Negative|Negative|Neutral|Positive|Very Positive]",
-                            "confidence": [0.0-1.0 float],
-                            "language_detected": "en",
-                            "explanation": "brief explanation"
-                        }
-                        """
-                    }
-                ]
-            }
-        ],
-        "generationConfig": {
-            "temperature": 0.1,
-            "topP": 0.8,
-            "topK": 40,
-            "maxOutputTokens": 1024
-        }
-    }
+    api_url = API_URL_TEMPLATE.format(api_key=api_key)
     
     print("🧪 Testing Your Original Model")
     print("=" * 50)
-    print(f"Model: {model_name}")
+    print(f"Model: {MODEL_NAME}")
     print(f"API Key: {'*' * 20}...{'*' * 10} (loaded from .env)")
     print()
     
     try:
         print("📡 Making API request...")
         
-        response = requests.post(
+        response = session.post(
             api_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
+            data=PAYLOAD_BYTES,
+            headers=HEADERS,
             timeout=30
         )
         
@@ -74,7 +102,7 @@ def test_original_model():
         if response.status_code == 200:
             print("✅ SUCCESS! Your original model works perfectly!")
             
-            response_data = response.json()
+            response_data = orjson.loads(response.content) if orjson is not None else response.json()
             
             if 'candidates' in response_data and response_data['candidates']:
                 candidate = response_data['candidates'][0]
@@ -105,7 +133,7 @@ def test_original_model():
                         print(f"Language: {sentiment_data.get('language_detected')}")
                         print(f"Explanation: {sentiment_data.get('explanation')}")
                         
-                        print(f"\n🎉 PERFECT! Your original model {model_name} works!")
+                        print(f"\n🎉 PERFECT! Your original model {MODEL_NAME} works!")
                         return True
                         
                     except json.JSONDecodeError:
@@ -1,167 +1,482 @@
 #!/usr/bin/env python3
 """
 Simple test script to verify the sentiment analyzer service works.
+
+Run directly, or with pytest. Pass --live (or set TEST_LIVE_GEMINI=1)
+to also run a real Gemini analysis.
 """
 
+import io
+import json
 import os
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import requests
 from dotenv import load_dotenv
 
+# Only needs the standard library, so reporting works even if the service modules do not import
+from run_standalone import write_lines
+
+# Read .env once per process, before any configuration is loaded
+load_dotenv(override=False)
+
+# Import the service modules once; test_imports reports the outcome
+try:
+    from config import Config, GeminiConfig, get_config
+    from gemini_client import GeminiAPIError, GeminiClient, SentimentAnalysisRequest, get_gemini_client
+    from standalone_app import create_app
+    _IMPORT_ERROR = None
+except Exception as e:
+    _IMPORT_ERROR = e
+
+
+class _ThreadLocalStdout:
+    """Stdout proxy that sends each worker thread's output to its own buffer."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer if buffer is not None else self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def capture(self, func, *args):
+        """Call func with this thread's output buffered, returning (result, output)."""
+        self._local.buffer = io.StringIO()
+        try:
+            result = func(*args)
+            return result, self._local.buffer.getvalue()
+        finally:
+            self._local.buffer = None
+
+
+@lru_cache(maxsize=1)
+def _flask_app():
+    """Create the Flask app once, in testing mode, and share it between tests."""
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
 def test_imports():
     """Test that all required modules can be imported."""
     print("🧪 Testing imports...")
     
-    try:
-        from config import get_config
-        print("✅ config module imported successfully")
-        
-        from gemini_client import GeminiClient, SentimentAnalysisRequest
-        print("✅ gemini_client module imported successfully")
-        
-        from standalone_app import create_app
-        print("✅ standalone_app module imported successfully")
-        
-        return True
-    except ImportError as e:
-        print(f"❌ Import error: {e}")
-        return False
-    except Exception as e:
-        print(f"❌ Unexpected error: {e}")
-        return False
+    assert not isinstance(_IMPORT_ERROR, ImportError), f"Import error: {_IMPORT_ERROR}"
+    assert _IMPORT_ERROR is None, f"Unexpected error: {_IMPORT_ERROR}"
+    
+    print("✅ config module imported successfully")
+    print("✅ gemini_client module imported successfully")
+    print("✅ standalone_app module imported successfully")
 
 def test_configuration():
     """Test configuration loading."""
     print("\n🔧 Testing configuration...")
     
-    try:
-        load_dotenv()
-        
-        from config import get_config
-        config = get_config()
-        
-        print("✅ Configuration loaded successfully")
-        
-        # Check validation
-        validation = config.validate()
-        if validation['valid']:
-            print("✅ Configuration is valid")
-        else:
-            print("❌ Configuration has errors:")
-            for error in validation['errors']:
-                print(f"  - {error}")
-            return False
-        
-        # Print summary
-        summary = config.config_summary()
-        print("📊 Configuration summary:")
-        for key, value in summary.items():
-            print(f"  {key}: {value}")
+    config = get_config()
+    
+    print("✅ Configuration loaded successfully")
+    
+    # Check validation
+    validation = config.validate()
+    assert validation['valid'], "Configuration has errors: " + "; ".join(validation['errors'])
+    print("✅ Configuration is valid")
+    
+    # Print summary
+    summary = config.config_summary()
+    print("📊 Configuration summary:")
+    for key, value in summary.items():
+        print(f"  {key}: {value}")
+
+def test_configuration_errors():
+    """Test that validation reports settings the service cannot start with."""
+    print("\n🚫 Testing configuration errors...")
+    
+    config = Config()
+    config._env = {
+        'GEMINI_API_KEY': 'test-key',
+        'ENVIRONMENT': 'production',
+        'SLACK_BOT_TOKEN': 'xoxb-test',
+        'PORT': 'http'
+    }
+    validation = config.validate()
+    assert not validation['valid'], "Invalid configuration was reported as valid"
+    for setting in ('SECRET_KEY', 'SLACK_SIGNING_SECRET', 'PORT'):
+        assert any(setting in error for error in validation['errors']), validation['errors']
+    
+    print("✅ Errors from every section are reported")
+
+def test_development_secret_key():
+    """Test that the cached development key survives an interrupted write."""
+    print("\n🔑 Testing development secret key...")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {'XDG_CACHE_HOME': cache_dir}
+        key_file = Path(cache_dir) / 'slack-sentiment-analyzer' / 'secret_key'
+        key_file.parent.mkdir()
+        key_file.touch()
         
-        return True
-    except Exception as e:
-        print(f"❌ Configuration error: {e}")
-        return False
+        config = Config()
+        secret_key = config._load_development_secret_key(env)
+        assert key_file.read_text() == secret_key, "Empty key file was not replaced"
+        assert config._load_development_secret_key(env) == secret_key, "Cached key was not reused"
+        assert os.listdir(key_file.parent) == ['secret_key'], "Temporary key file was left behind"
+    
+    print("✅ Empty key file is replaced and the key is reused")
 
-def test_gemini_client():
-    """Test Gemini client initialization."""
+def _live_requested():
+    """Return whether the live Gemini round-trip was requested."""
+    return '--live' in sys.argv[1:] or os.getenv('TEST_LIVE_GEMINI') == '1'
+
+def test_gemini_client(live=None):
+    """Test Gemini client initialization, and a live analysis when requested."""
     print("\n🤖 Testing Gemini client...")
     
-    try:
-        from config import get_config
-        from gemini_client import GeminiClient, SentimentAnalysisRequest
-        
-        config = get_config()
-        
-        # Check if API key is available
-        if not config.gemini.api_key or config.gemini.api_key == 'your_gemini_api_key_here':
-            print("⚠️  No valid API key found - skipping actual API test")
-            print("✅ Gemini client can be initialized (API key needed for actual testing)")
-            return True
-        
-        client = GeminiClient(config.gemini)
-        print("✅ Gemini client initialized successfully")
-        
-        # Test with a simple request (if API key is available)
-        request = SentimentAnalysisRequest(
-            text="This is a test message",
-            language="auto"
+    if live is None:
+        live = _live_requested()
+    
+    config = get_config()
+    
+    client = get_gemini_client()
+    print("✅ Gemini client initialized successfully")
+    
+    request = SentimentAnalysisRequest(
+        text="This is a test message",
+        language="auto"
+    )
+    assert request.text == "This is a test message", "Sentiment analysis request has unexpected text"
+    assert request.channel_type == 'web', "Sentiment analysis request has unexpected channel type"
+    print("✅ Sentiment analysis request created successfully")
+    
+    if not live:
+        print("⏭️  Skipping live API test (run with --live or TEST_LIVE_GEMINI=1)")
+        return
+    
+    # Check if API key is available
+    if not config.gemini.api_key or config.gemini.api_key == 'your_gemini_api_key_here':
+        print("⚠️  No valid API key found - skipping actual API test")
+        print("✅ Gemini client can be initialized (API key needed for actual testing)")
+        return
+    
+    # A few texts in one batch prompt cost a single round-trip
+    batch = [
+        request,
+        SentimentAnalysisRequest(text="Great work team, this is fantastic!", language="auto"),
+        SentimentAnalysisRequest(text="This release is broken again.", language="auto")
+    ]
+    
+    print("🔍 Testing sentiment analysis...")
+    responses = client.analyze_sentiment_batch(batch)
+    assert len(responses) == len(batch), f"Expected {len(batch)} results, got {len(responses)}"
+    
+    print(f"✅ Sentiment analysis successful!")
+    for item, response in zip(batch, responses):
+        assert not isinstance(response, Exception), f"Analysis of {item.text!r} failed: {response}"
+        assert 1 <= response.sentiment_score <= 5, f"Sentiment score out of range: {response.sentiment_score}"
+        print(f"  {item.text!r}: {response.sentiment_score}/5 {response.sentiment_label} ({response.confidence:.0%})")
+
+def _stub_client(respond, **config_overrides):
+    """Create an uncached client whose API calls are answered by respond(prompt)."""
+    client = GeminiClient(GeminiConfig(
+        api_key='test-key', model_name='test-model', cache_size=0, **config_overrides
+    ))
+    client._make_api_request = lambda prompt, **kwargs: respond(prompt)
+    return client
+
+def _single_result(score):
+    """Return a model reply for a single-text prompt."""
+    return f'{{"sentiment_score": {score}, "confidence": 0.9, "explanation": "stub", "language_detected": "en"}}'
+
+def test_response_parsing():
+    """Test recovery of sentiment results from malformed model replies."""
+    print("\n🧩 Testing response parsing...")
+    
+    client = _stub_client(_single_result)
+    cases = [
+        # (model reply, expected score, expected confidence)
+        ('{"sentiment_score": 4, "confidence": 0.8}', 4, 0.8),
+        ('{"sentiment_label": "Positive", "sentim', 4, 0.7),  # No score: inferred from text
+        ('Sure {here} it is: {"sentiment_score": 4}', 4, 0.95),  # Later object is used
+        ('{"sentiment_score": 4, "confidence": 0.', 4, 0.95),  # Cut-off number is dropped
+        ('{"sentiment_score": 2, "explanation": "cut sho', 2, 0.95)
+    ]
+    
+    for reply, expected_score, expected_confidence in cases:
+        response = client._parse_api_response(reply, 'auto')
+        assert (response.sentiment_score, response.confidence) == (expected_score, expected_confidence), (
+            f"{reply!r} parsed as score {response.sentiment_score}, confidence {response.confidence}"
         )
-        
-        print("🔍 Testing sentiment analysis...")
-        response = client.analyze_sentiment(request)
-        
-        print(f"✅ Sentiment analysis successful!")
-        print(f"  Score: {response.sentiment_score}/5")
-        print(f"  Label: {response.sentiment_label}")
-        print(f"  Confidence: {response.confidence:.0%}")
-        
-        return True
-    except Exception as e:
-        print(f"❌ Gemini client error: {e}")
-        return False
+    print(f"✅ {len(cases)} malformed replies parsed as expected")
+
+def test_batch_fallback():
+    """Test that batch analysis falls back per text on parse errors but not on API errors."""
+    print("\n📦 Testing batch fallback...")
+    
+    texts = ["good one", "bad one", "good two"]
+    batch = [SentimentAnalysisRequest(text=text) for text in texts]
+    
+    # An unparseable batch reply falls back to one request per text; a failing
+    # text reports its own error without discarding the others
+    def unparseable_batch(prompt):
+        if "good one" in prompt and "good two" in prompt:
+            return "not json"
+        if "bad one" in prompt:
+            raise GeminiAPIError("boom")
+        return _single_result(4)
+    
+    results = _stub_client(unparseable_batch).analyze_sentiment_batch(batch)
+    assert [getattr(result, 'sentiment_score', None) for result in results] == [4, None, 4], results
+    assert isinstance(results[1], GeminiAPIError), results[1]
+    print("✅ Unparseable batch reply falls back per text")
+    
+    # An API failure of the batch call itself is raised, not retried per text
+    calls = []
+    def rate_limited(prompt):
+        calls.append(prompt)
+        raise GeminiAPIError("Rate limit exceeded")
+    
+    try:
+        _stub_client(rate_limited).analyze_sentiment_batch(batch)
+    except GeminiAPIError:
+        pass
+    else:
+        raise AssertionError("Batch API failure was not raised")
+    assert len(calls) == 1, f"Expected 1 API call, got {len(calls)}"
+    print("✅ Batch API failure is raised without per-text retries")
+
+def test_micro_batch_fallback():
+    """Test that a micro-batch resolves each caller separately when its batch reply is unusable."""
+    print("\n🧺 Testing micro-batch fallback...")
+    
+    # Only passes once all three fallback requests are in flight together
+    barrier = threading.Barrier(3, timeout=5)
+    
+    def respond(prompt):
+        if "good1" in prompt and "good2" in prompt:
+            return "not json"
+        barrier.wait()
+        if "bad" in prompt:
+            raise GeminiAPIError("boom")
+        return _single_result(4)
+    
+    client = _stub_client(respond, batch_window_ms=50)
+    
+    def analyze(text):
+        try:
+            return client.analyze_sentiment(SentimentAnalysisRequest(text=text)).sentiment_score
+        except GeminiAPIError as e:
+            return f"EXC {e}"
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = dict(zip(["good1", "bad", "good2"], executor.map(analyze, ["good1", "bad", "good2"])))
+    
+    assert results == {'good1': 4, 'bad': 'EXC boom', 'good2': 4}, results
+    print("✅ Each caller gets its own result or error")
+    
+    # The three single requests run concurrently rather than back to back
+    assert not barrier.broken, "Fallback requests did not overlap"
+    print("✅ Fallback requests run concurrently")
+
+def _sse_response(status_code, body=b'', headers=None):
+    """Build a streamed requests.Response, as Gemini's SSE endpoint would send it."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {'Content-Type': 'text/event-stream'})
+    response.raw = io.BytesIO(body)
+    return response
+
+def test_stream_retry():
+    """Test that streaming retries a rate limit before output starts and decodes UTF-8."""
+    print("\n📡 Testing streaming retries...")
+    
+    reply = '{"sentiment_score": 5, "explanation": "とても嬉しい"}'
+    event = json.dumps({'candidates': [{'content': {'parts': [{'text': reply}]}}]}, ensure_ascii=False)
+    responses = [
+        _sse_response(429, headers={'Retry-After': '0'}),
+        _sse_response(200, f"data: {event}\n\n".encode('utf-8'))
+    ]
+    
+    client = _stub_client(_single_result)
+    client.session.post = lambda *args, **kwargs: responses.pop(0)
+    
+    items = list(client.analyze_sentiment_stream(SentimentAnalysisRequest(text="今日はとても嬉しいです！")))
+    assert not responses, "Rate-limited stream was not retried"
+    print("✅ Rate-limited stream is retried")
+    
+    assert items[:-1] == [reply], f"Streamed chunks were {items[:-1]!r}"
+    assert items[-1].sentiment_score == 5 and items[-1].explanation == "とても嬉しい", items[-1]
+    print("✅ Streamed text is decoded as UTF-8")
+    
+    # A stalled owner must not block identical requests indefinitely
+    client = _stub_client(_single_result, timeout=1, max_retries=1)
+    stalled = SentimentAnalysisRequest(text="Waiting on a stalled stream")
+    client._claim_inflight(client._cache_key(stalled))
+    try:
+        client.analyze_sentiment(stalled)
+    except GeminiAPIError:
+        pass
+    else:
+        raise AssertionError("Waiter on a stalled stream did not time out")
+    print("✅ Waiting on an in-flight analysis is bounded")
 
 def test_flask_app():
     """Test Flask app creation."""
     print("\n🌐 Testing Flask app...")
     
+    app = _flask_app()
+    print("✅ Flask app created successfully")
+    
+    # Test that routes are registered
+    routes = {rule.rule for rule in app.url_map.iter_rules()}
+    expected_routes = ['/', '/health', '/api/analyze', '/api/batch']
+    
+    for route in expected_routes:
+        assert route in routes, f"Route {route} missing"
+        print(f"✅ Route {route} registered")
+    
+    # Exercise the routes in-process; none of these reach the Gemini API
+    client = app.test_client()
+    checks = [
+        ('GET', '/', None, 200),
+        ('GET', '/health', None, 200),
+        ('POST', '/api/analyze', {}, 400),
+        ('POST', '/api/analyze', {'text': 'hi', 'language': ['en']}, 400),
+        ('POST', '/api/analyze', {'text': 'hi', 'context': {'a': 1}}, 400),
+        ('POST', '/api/batch', {}, 400),
+        ('POST', '/api/batch', 5, 400),
+        # Over the item limit (not the body size limit) despite ~1.5 MB of UTF-8
+        ('POST', '/api/batch', {'texts': ['あ' * 10000] * 51}, 400)
+    ]
+    
+    for method, route, body, expected_status in checks:
+        response = client.open(route, method=method, json=body)
+        assert response.status_code == expected_status, (
+            f"{method} {route} returned {response.status_code}, expected {expected_status}"
+        )
+        print(f"✅ {method} {route} returned {expected_status}")
+    
+    # Every response carries the request ID its log lines were tagged with
+    response = client.get('/health', headers={'X-Request-ID': 'test-request'})
+    assert response.headers.get('X-Request-ID') == 'test-request', response.headers
+    assert len(client.get('/health').headers.get('X-Request-ID', '')) == 32, "No request ID was generated"
+    print("✅ Request IDs are echoed or generated")
+    
+    # Malformed JSON gets a JSON error from every API route
+    for route in ('/api/analyze', '/api/analyze/stream', '/api/batch'):
+        response = client.post(route, data='{"text": ', content_type='application/json')
+        assert response.status_code == 400 and response.is_json, (
+            f"POST {route} with malformed JSON returned {response.status_code} {response.mimetype}"
+        )
+    print("✅ Malformed JSON returns a JSON 400")
+    
+    # The index is only gzip-compressed for clients that accept it
+    for accept_encoding, expected_encoding in [('gzip', 'gzip'), ('gzip;q=0, identity', None)]:
+        response = client.get('/', headers={'Accept-Encoding': accept_encoding})
+        assert response.headers.get('Content-Encoding') == expected_encoding, (
+            f"Accept-Encoding {accept_encoding!r} got Content-Encoding {response.headers.get('Content-Encoding')!r}"
+        )
+    print("✅ Index compression follows Accept-Encoding")
+
+def run_test(test_name, test_func, dependencies=()):
+    """Run one test once its prerequisites pass; return True, False, or None if skipped."""
+    # Prerequisite results are (passed, output) pairs from their futures
+    if not all(future.result()[0] for future in dependencies):
+        print(f"\n{'='*20} {test_name} {'='*20}")
+        print(f"⏭️  {test_name} SKIPPED (a prerequisite test did not pass)")
+        return None
+    
+    print(f"\n{'='*20} {test_name} {'='*20}")
     try:
-        from standalone_app import create_app
-        
-        app = create_app()
-        print("✅ Flask app created successfully")
-        
-        # Test that routes are registered
-        routes = [rule.rule for rule in app.url_map.iter_rules()]
-        expected_routes = ['/', '/health', '/api/analyze', '/api/batch']
-        
-        for route in expected_routes:
-            if route in routes:
-                print(f"✅ Route {route} registered")
-            else:
-                print(f"❌ Route {route} missing")
-                return False
-        
+        test_func()
+        print(f"✅ {test_name} PASSED")
         return True
+    except AssertionError as e:
+        print(f"❌ {e}")
+        print(f"❌ {test_name} FAILED")
     except Exception as e:
-        print(f"❌ Flask app error: {e}")
-        return False
+        print(f"❌ {test_name} FAILED with exception: {e}")
+    return False
 
 def main():
     """Run all tests."""
-    print("🎭 Sentiment Analyzer Service Test")
-    print("=" * 50)
+    header = [
+        "🎭 Sentiment Analyzer Service Test",
+        "=" * 50
+    ]
     
+    # The checks are assert statements, which python -O compiles away
+    if not __debug__:
+        header.append("❌ Assertions are disabled (python -O); run the tests without -O")
+        write_lines(header)
+        return False
+    
+    write_lines(header)
+    
+    # Each test lists the tests it depends on; those must appear earlier
     tests = [
-        ("Import Test", test_imports),
-        ("Configuration Test", test_configuration),
-        ("Gemini Client Test", test_gemini_client),
-        ("Flask App Test", test_flask_app)
+        ("Import Test", test_imports, []),
+        ("Configuration Test", test_configuration, ["Import Test"]),
+        ("Configuration Errors Test", test_configuration_errors, ["Import Test"]),
+        ("Secret Key Test", test_development_secret_key, ["Import Test"]),
+        ("Gemini Client Test", test_gemini_client, ["Import Test", "Configuration Test"]),
+        ("Response Parsing Test", test_response_parsing, ["Import Test"]),
+        ("Batch Fallback Test", test_batch_fallback, ["Import Test"]),
+        ("Stream Retry Test", test_stream_retry, ["Import Test"]),
+        ("Micro-batch Fallback Test", test_micro_batch_fallback, ["Import Test"]),
+        ("Flask App Test", test_flask_app, ["Import Test"])
     ]
     
     passed = 0
+    skipped = 0
     total = len(tests)
     
-    for test_name, test_func in tests:
-        print(f"\n{'='*20} {test_name} {'='*20}")
-        try:
-            if test_func():
-                passed += 1
-                print(f"✅ {test_name} PASSED")
-            else:
-                print(f"❌ {test_name} FAILED")
-        except Exception as e:
-            print(f"❌ {test_name} FAILED with exception: {e}")
+    # Run the tests concurrently, buffering each one's output so it is written
+    # in one piece rather than a write per print
+    stdout = _ThreadLocalStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=total) as executor:
+            futures = {}
+            for test_name, test_func, dependencies in tests:
+                futures[test_name] = executor.submit(
+                    stdout.capture, run_test, test_name, test_func,
+                    [futures[name] for name in dependencies]
+                )
+            
+            for future in futures.values():
+                test_passed, output = future.result()
+                stdout.stream.write(output)
+                stdout.stream.flush()
+                if test_passed:
+                    passed += 1
+                elif test_passed is None:
+                    skipped += 1
+    finally:
+        sys.stdout = stdout.stream
     
-    print("\n" + "=" * 50)
-    print(f"📊 Test Results: {passed}/{total} tests passed")
+    summary = [
+        "\n" + "=" * 50,
+        f"📊 Test Results: {passed}/{total} tests passed" + (f" ({skipped} skipped)" if skipped else "")
+    ]
     
     if passed == total:
-        print("🎉 All tests passed! Service is ready to use.")
-        print("\n🚀 To start the service, run:")
-        print("python3 run_standalone.py")
+        summary.append("🎉 All tests passed! Service is ready to use.")
+        summary.append("\n🚀 To start the service, run:")
+        summary.append("python3 run_standalone.py")
+        write_lines(summary)
         return True
     else:
-        print("❌ Some tests failed. Please check the errors above.")
+        summary.append("❌ Some tests failed. Please check the errors above.")
+        write_lines(summary)
         return False
 
 if __name__ == '__main__':